@@ -1,11 +1,10 @@
 import pandas as pd
 import numpy as np
 import datetime
-import random
+import pyarrow  # noqa: F401  (engine for the Parquet copy written below)
 
-# Set random seed for reproducibility
-np.random.seed(42)
-random.seed(42)
+# Random generator (PCG64) seeded for reproducibility
+rng = np.random.default_rng(42)
 
 # Define Station Data
 stations = [
@@ -28,129 +27,132 @@ STATE = "Tamil Nadu"
 # Parameters
 NUM_RECORDS = 1000
 
-# Helper to generate random timestamp
-def random_date(start, end):
-    delta = end - start
-    int_delta = (delta.days * 24 * 60 * 60) + delta.seconds
-    random_second = random.randrange(int_delta)
-    return start + datetime.timedelta(seconds=random_second)
-
 end_date = datetime.datetime.now()
 start_date = end_date - datetime.timedelta(days=30)
 
-data = []
-
-previous_timestamps = set()
-
-for _ in range(NUM_RECORDS):
-    # Select random station
-    station = random.choice(stations)
-    
-    # Generate timestamp ensuring uniqueness (though simplistic, probability of collision is low)
-    while True:
-        timestamp = random_date(start_date, end_date).replace(microsecond=0)
-        if (station['station_id'], timestamp) not in previous_timestamps:
-            previous_timestamps.add((station['station_id'], timestamp))
-            break
-            
-    # Base Weather Conditions
-    temperature = round(np.random.uniform(24, 40), 1)
-    humidity = round(np.random.uniform(40, 90), 1)
-    wind_speed = round(np.random.uniform(0.5, 6.0), 1)
-    
-    # Traffic Level
-    traffic_level = np.random.choice(["Low", "Moderate", "High"], p=[0.3, 0.4, 0.3])
-    
-    # Base Pollution Levels (Randomized)
-    # PM2.5: 10-300
-    pm25_base = np.random.uniform(10, 150) # Base relatively standard, spikes added later
-    # PM10: 20-400
-    pm10_base = np.random.uniform(20, 200)
-    # NO2: 5-150
-    no2_base = np.random.uniform(5, 80)
-    # SO2: 2-100
-    so2_base = np.random.uniform(2, 40)
-    # CO: 0.3-10
-    co_base = np.random.uniform(0.3, 5)
-    # O3: 5-180
-    o3_base = np.random.uniform(5, 100)
-
-    # Apply Traffic Influence
-    traffic_multiplier = 1.0
-    if traffic_level == "Moderate":
-        traffic_multiplier = np.random.uniform(1.1, 1.3)
-    elif traffic_level == "High":
-        traffic_multiplier = np.random.uniform(1.4, 1.8)
-        
-    pm25 = pm25_base * traffic_multiplier
-    pm10 = pm10_base * traffic_multiplier
-    no2 = no2_base * traffic_multiplier
-    co = co_base * traffic_multiplier * 0.8 # CO heavily influenced by traffic
-    
-    # Apply Wind Influence (Higher wind -> Lower pollution)
-    wind_factor = 1.0
-    if wind_speed > 3.0:
-        wind_factor = np.random.uniform(0.6, 0.8) # Dispersion
-    elif wind_speed < 1.0:
-        wind_factor = np.random.uniform(1.1, 1.3) # Stagnation
-        
-    pm25 *= wind_factor
-    pm10 *= wind_factor
-    no2 *= wind_factor
-    so2 = so2_base * wind_factor # SO2 also disperses
-    co *= wind_factor
-    o3 = o3_base # O3 less directly correlated with simple wind/traffic in this simplistic model, kept random
-    
-    # Ensure values stay within bounds
-    pm25 = max(10, min(300, pm25))
-    pm10 = max(20, min(400, pm10))
-    no2 = max(5, min(150, no2))
-    so2 = max(2, min(100, so2))
-    co = max(0.3, min(10, co))
-    o3 = max(5, min(180, o3))
-
-    # Calculate AQI (Simplified Max-Subindex approach)
-    # Real CPCB AQI is complex breakpoints, here we simulate correlation
-    # AQI is primarily driven by PM2.5 and PM10
-    
-    # Normalize to 0-400 roughly based on dominant pollutant
-    # PM2.5 roughly 0-300 scales to 0-400 (factor 1.33)
-    # PM10 roughly 0-400 scales to 0-400 (factor 1.0)
-    
-    aqi_from_pm25 = pm25 * 1.3
-    aqi_from_pm10 = pm10 * 1.0
-    
-    calculated_aqi = max(aqi_from_pm25, aqi_from_pm10)
-    
-    # Add some noise to AQI to make it look "measured" rather than perfectly calculated
-    calculated_aqi += np.random.normal(0, 10)
-    
-    aqi = int(max(30, min(400, calculated_aqi)))
-    
-    record = {
-        "station_id": station["station_id"],
-        "station_name": station["station_name"],
-        "city": CITY,
-        "state": STATE,
-        "latitude": station["latitude"],
-        "longitude": station["longitude"],
-        "timestamp": timestamp,
-        "AQI": aqi,
-        "PM2.5": round(pm25, 2),
-        "PM10": round(pm10, 2),
-        "NO2": round(no2, 2),
-        "SO2": round(so2, 2),
-        "CO": round(co, 2),
-        "O3": round(o3, 2),
-        "temperature": temperature,
-        "humidity": humidity,
-        "wind_speed": wind_speed,
-        "traffic_level": traffic_level
-    }
-    data.append(record)
-
-# Create DataFrame
-df = pd.DataFrame(data)
+# Select random stations for all records at once
+station_idx = rng.integers(0, len(stations), NUM_RECORDS)
+station_ids = np.array([s["station_id"] for s in stations], dtype=object)[station_idx]
+station_names = np.array([s["station_name"] for s in stations], dtype=object)[station_idx]
+latitudes = np.array([s["latitude"] for s in stations], dtype=np.float64)[station_idx]
+longitudes = np.array([s["longitude"] for s in stations], dtype=np.float64)[station_idx]
+
+# Generate timestamps as random second offsets from the start date
+total_seconds = int((end_date - start_date).total_seconds())
+offsets = rng.integers(0, total_seconds, NUM_RECORDS)
+
+# Ensure (station, timestamp) uniqueness by re-drawing only the colliding rows
+# (probability of collision is low, so this rarely loops)
+while True:
+    duplicated = pd.DataFrame({"station": station_idx, "offset": offsets}).duplicated().to_numpy()
+    if not duplicated.any():
+        break
+    offsets[duplicated] = rng.integers(0, total_seconds, duplicated.sum())
+
+timestamps = np.datetime64(start_date.replace(microsecond=0), "s") + offsets.astype("timedelta64[s]")
+
+# Base Weather Conditions
+temperature = np.round(rng.uniform(24, 40, NUM_RECORDS), 1)
+humidity = np.round(rng.uniform(40, 90, NUM_RECORDS), 1)
+wind_speed = np.round(rng.uniform(0.5, 6.0, NUM_RECORDS), 1)
+
+# Traffic Level
+traffic_level = rng.choice(["Low", "Moderate", "High"], size=NUM_RECORDS, p=[0.3, 0.4, 0.3])
+
+# Base Pollution Levels (Randomized)
+# PM2.5: 10-300
+pm25_base = rng.uniform(10, 150, NUM_RECORDS) # Base relatively standard, spikes added later
+# PM10: 20-400
+pm10_base = rng.uniform(20, 200, NUM_RECORDS)
+# NO2: 5-150
+no2_base = rng.uniform(5, 80, NUM_RECORDS)
+# SO2: 2-100
+so2_base = rng.uniform(2, 40, NUM_RECORDS)
+# CO: 0.3-10
+co_base = rng.uniform(0.3, 5, NUM_RECORDS)
+# O3: 5-180
+o3_base = rng.uniform(5, 100, NUM_RECORDS)
+
+# Apply Traffic Influence
+traffic_multiplier = np.where(
+    traffic_level == "High", rng.uniform(1.4, 1.8, NUM_RECORDS),
+    np.where(traffic_level == "Moderate", rng.uniform(1.1, 1.3, NUM_RECORDS), 1.0)
+)
+
+pm25 = pm25_base * traffic_multiplier
+pm10 = pm10_base * traffic_multiplier
+no2 = no2_base * traffic_multiplier
+co = co_base * traffic_multiplier * 0.8 # CO heavily influenced by traffic
+
+# Apply Wind Influence (Higher wind -> Lower pollution)
+wind_factor = np.where(
+    wind_speed > 3.0, rng.uniform(0.6, 0.8, NUM_RECORDS), # Dispersion
+    np.where(wind_speed < 1.0, rng.uniform(1.1, 1.3, NUM_RECORDS), 1.0) # Stagnation
+)
+
+pm25 *= wind_factor
+pm10 *= wind_factor
+no2 *= wind_factor
+so2 = so2_base * wind_factor # SO2 also disperses
+co *= wind_factor
+o3 = o3_base.copy() # O3 less directly correlated with simple wind/traffic in this simplistic model, kept random
+
+# Ensure values stay within bounds (in place, no temporaries)
+np.clip(pm25, 10, 300, out=pm25)
+np.clip(pm10, 20, 400, out=pm10)
+np.clip(no2, 5, 150, out=no2)
+np.clip(so2, 2, 100, out=so2)
+np.clip(co, 0.3, 10, out=co)
+np.clip(o3, 5, 180, out=o3)
+
+# Calculate AQI (Simplified Max-Subindex approach)
+# Real CPCB AQI is complex breakpoints, here we simulate correlation
+# AQI is primarily driven by PM2.5 and PM10
+
+# Normalize to 0-400 roughly based on dominant pollutant
+# PM2.5 roughly 0-300 scales to 0-400 (factor 1.33)
+# PM10 roughly 0-400 scales to 0-400 (factor 1.0)
+
+aqi_from_pm25 = pm25 * 1.3
+aqi_from_pm10 = pm10 * 1.0
+
+calculated_aqi = np.maximum(aqi_from_pm25, aqi_from_pm10)
+
+# Add some noise to AQI to make it look "measured" rather than perfectly calculated
+calculated_aqi += rng.normal(0, 10, NUM_RECORDS)
+
+np.clip(calculated_aqi, 30, 400, out=calculated_aqi)
+aqi = calculated_aqi.astype(np.int32)
+
+# Round pollutant readings in place
+for values in (pm25, pm10, no2, so2, co, o3):
+    np.round(values, 2, out=values)
+
+# Create DataFrame directly from the typed column arrays (no dtype inference).
+# Readings are float32 and labels are categorical to keep the frame compact.
+measurements = {
+    "PM2.5": pm25,
+    "PM10": pm10,
+    "NO2": no2,
+    "SO2": so2,
+    "CO": co,
+    "O3": o3,
+    "temperature": temperature,
+    "humidity": humidity,
+    "wind_speed": wind_speed,
+}
+df = pd.DataFrame({
+    "station_id": pd.Categorical(station_ids),
+    "station_name": pd.Categorical(station_names),
+    "city": pd.Categorical(np.full(NUM_RECORDS, CITY, dtype=object)),
+    "state": pd.Categorical(np.full(NUM_RECORDS, STATE, dtype=object)),
+    "latitude": latitudes,
+    "longitude": longitudes,
+    "timestamp": timestamps,
+    "AQI": aqi,
+    **{name: values.astype(np.float32) for name, values in measurements.items()},
+    "traffic_level": pd.Categorical(traffic_level, categories=["Low", "Moderate", "High"]),
+})
 
 # Sort by timestamp for better readability
 df = df.sort_values(by="timestamp")
@@ -164,5 +166,8 @@ assert df.isnull().sum().sum() == 0, "Null values found"
 filename = "simulated_cpcb_aqi_data.csv"
 df.to_csv(filename, index=False)
 
+# Typed columnar copy (keeps datetime64, float32 and category dtypes on load)
+df.to_parquet("simulated_cpcb_aqi_data.parquet", index=False, compression="zstd")
+
 print(f"Simulated CPCB AQI dataset with {len(df)} records successfully created.")
 print(df.head())
@@ -1,16 +1,21 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 import pandas as pd
 import uvicorn
+import logging
 import os
 import sys
+import time
 
 # Add the current directory to the system path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from modules.prediction_engine import load_prediction_model, predict_future_aqi
 from modules.future_policy_engine import apply_future_policy_engine
+from modules.preprocessing import aqi_bins
+
+logger = logging.getLogger(__name__)
 
 app = FastAPI(title="Urban Policy Decision Engine API")
 
@@ -27,6 +32,30 @@ app.add_middleware(
 model = None
 data = None
 
+DATA_CSV_PATH = "data/final_policy_decision_dataset.csv"
+DATA_PARQUET_PATH = "data/final_policy_decision_dataset.parquet"
+
+def load_policy_dataset():
+    """
+    Loads the policy dataset, preferring the typed Parquet copy. The CSV is
+    parsed and the Parquet copy (re)written next to it when the copy is
+    missing or older than the CSV, so a regenerated dataset is picked up.
+    """
+    if os.path.exists(DATA_PARQUET_PATH) and (
+            not os.path.exists(DATA_CSV_PATH)
+            or os.path.getmtime(DATA_PARQUET_PATH) >= os.path.getmtime(DATA_CSV_PATH)):
+        return pd.read_parquet(DATA_PARQUET_PATH)
+
+    df = pd.read_csv(DATA_CSV_PATH)
+    df['timestamp'] = pd.to_datetime(df['timestamp'])
+    df['station_name'] = df['station_name'].astype('category')
+    try:
+        df.to_parquet(DATA_PARQUET_PATH, compression="zstd")
+    except (ImportError, OSError) as e:
+        # The CSV is still served; only the cached copy is missing
+        logger.warning("Could not write Parquet copy of dataset: %s", e)
+    return df
+
 @app.on_event("startup")
 async def startup_event():
     global model, data
@@ -34,12 +63,18 @@ async def startup_event():
     try:
         model = load_prediction_model()
         # Load dataset for feature reference
-        data = pd.read_csv("data/final_policy_decision_dataset.csv") 
-        data['timestamp'] = pd.to_datetime(data['timestamp'])
+        data = load_policy_dataset()
         print("Model and data loaded successfully.")
     except Exception as e:
         print(f"Error loading resources: {e}")
 
+def to_json_records(df):
+    """Serializes a DataFrame straight to a JSON array of records."""
+    return df.to_json(orient="records", date_format="iso", date_unit="s")
+
+def json_response(content):
+    return Response(content=content, media_type="application/json")
+
 @app.get("/")
 def read_root():
     return {"message": "Urban Policy Decision Engine API is running"}
@@ -49,40 +84,52 @@ def get_historical_data():
     if data is None:
         raise HTTPException(status_code=503, detail="Data not loaded")
     # Return a sample for now to avoid huge payload
-    return data.tail(100).to_dict(orient="records")
+    return json_response(to_json_records(data.tail(100)))
 
-# Simple in-memory cache
+# Simple in-memory cache of the forecast (with policies) shared by both endpoints,
+# stored both as a DataFrame and as the serialized JSON payload
 prediction_cache = {
     "data": None,
+    "json": None,
+    "hours": None,
     "timestamp": None
 }
+CACHE_TTL_SECONDS = 3600 # valid for 1 hour for demo purposes
+
+def _get_cached_predictions(hours):
+    """
+    Returns the forecast DataFrame for `hours` and its JSON payload,
+    recomputing both when the cache is stale.
+    """
+    current_time = time.time()
+    if (prediction_cache["data"] is not None and prediction_cache["hours"] == hours
+            and current_time - prediction_cache["timestamp"] < CACHE_TTL_SECONDS):
+        return prediction_cache["data"], prediction_cache["json"]
+
+    predictions_df = predict_future_aqi(data, hours_ahead=hours)
+
+    # Apply Future Policy Engine (AQI threshold masks are computed once and shared)
+    bins = aqi_bins(predictions_df['predicted_AQI'].to_numpy()) if not predictions_df.empty else None
+    predictions_with_policy = apply_future_policy_engine(predictions_df, bins)
+
+    predictions_json = to_json_records(predictions_with_policy)
+
+    # Update cache
+    prediction_cache["data"] = predictions_with_policy
+    prediction_cache["json"] = predictions_json
+    prediction_cache["hours"] = hours
+    prediction_cache["timestamp"] = current_time
+
+    return predictions_with_policy, predictions_json
 
 @app.get("/api/future-predictions")
 def get_future_predictions(hours: int = 24):
-    global prediction_cache
     if model is None or data is None:
         raise HTTPException(status_code=503, detail="Model or data not available")
     
-    # Check cache (valid for 1 hour for demo purposes)
-    import time
-    current_time = time.time()
-    if prediction_cache["data"] is not None and prediction_cache["timestamp"] is not None:
-        if current_time - prediction_cache["timestamp"] < 3600: # 1 hour cache
-            return prediction_cache["data"]
-    
     try:
-        predictions_df = predict_future_aqi(data, hours_ahead=hours)
-        
-        # Apply Future Policy Engine
-        predictions_with_policy = apply_future_policy_engine(predictions_df)
-        
-        result = predictions_with_policy.to_dict(orient="records")
-        
-        # Update cache
-        prediction_cache["data"] = result
-        prediction_cache["timestamp"] = current_time
-        
-        return result
+        _, predictions_json = _get_cached_predictions(hours)
+        return json_response(predictions_json)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -92,19 +139,16 @@ def get_station_predictions(station_name: str, hours: int = 24):
         raise HTTPException(status_code=503, detail="Model or data not available")
     
     try:
-        predictions_df = predict_future_aqi(data, hours_ahead=hours)
-        
-        station_preds = predictions_df[predictions_df['station_name'] == station_name]
-        
-        if station_preds.empty:
-            raise HTTPException(status_code=404, detail="Station not found")
-        
-        # Apply Future Policy Engine
-        station_preds_with_policy = apply_future_policy_engine(station_preds)
-
-        return station_preds_with_policy.to_dict(orient="records")
+        predictions_with_policy, _ = _get_cached_predictions(hours)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    station_preds = predictions_with_policy[predictions_with_policy['station_name'] == station_name]
+
+    if station_preds.empty:
+        raise HTTPException(status_code=404, detail="Station not found")
+
+    return json_response(to_json_records(station_preds))
+
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
@@ -3,10 +3,10 @@ import os
 
 def load_dataset(file_path):
     """
-    Loads the dataset from a CSV file.
+    Loads the dataset from a CSV or Parquet file.
     
     Args:
-        file_path (str): Path to the CSV file.
+        file_path (str): Path to the CSV or Parquet file.
         
     Returns:
         pd.DataFrame: Loaded DataFrame.
@@ -19,7 +19,11 @@ def load_dataset(file_path):
         raise FileNotFoundError(f"File not found at: {file_path}")
         
     try:
-        df = pd.read_csv(file_path)
+        if file_path.endswith('.parquet'):
+            # Parquet keeps the written dtypes (datetime64, float32, category)
+            df = pd.read_parquet(file_path)
+        else:
+            df = pd.read_csv(file_path)
         print(f"Dataset loaded successfully from {file_path}")
         return df
     except Exception as e:
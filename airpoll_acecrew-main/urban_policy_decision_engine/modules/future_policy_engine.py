@@ -1,51 +1,49 @@
+import numpy as np
 import pandas as pd
 
-def generate_future_policy_recommendations(prediction_row):
-    """
-    Generates preventive policy recommendations based on predicted AQI and Risk Level.
-    """
-    aqi = prediction_row.get('predicted_AQI', 0)
-    
-    recommendations = []
+from modules.preprocessing import aqi_bins
 
-    if aqi > 300:
-        recommendations = [
-            "Emergency pollution control activation",
-            "Suspend heavy vehicle traffic immediately",
-            "Temporary industrial shutdown within 5 km radius",
-            "Issue public emergency health advisory"
-        ]
-    elif 200 < aqi <= 300:
-        recommendations = [
-            "Restrict heavy vehicle entry during peak hours",
-            "Activate traffic diversion routes",
-            "Promote public transport usage",
-            "Issue early public health advisory"
-        ]
-    elif 150 < aqi <= 200:
-        recommendations = [
-            "Encourage public transport usage",
-            "Monitor pollution closely",
-            "Prepare traffic control readiness"
-        ]
-    else:
-        recommendations = [
-            "No preventive action required",
-            "Continue monitoring"
-        ]
-    
-    return recommendations
+# Tuples, so the rows that share a recommendation cannot alter it for each other
+FUTURE_POLICY_RECOMMENDATIONS = {
+    0: (
+        "No preventive action required",
+        "Continue monitoring"
+    ),
+    1: (
+        "Encourage public transport usage",
+        "Monitor pollution closely",
+        "Prepare traffic control readiness"
+    ),
+    2: (
+        "Restrict heavy vehicle entry during peak hours",
+        "Activate traffic diversion routes",
+        "Promote public transport usage",
+        "Issue early public health advisory"
+    ),
+    3: (
+        "Emergency pollution control activation",
+        "Suspend heavy vehicle traffic immediately",
+        "Temporary industrial shutdown within 5 km radius",
+        "Issue public emergency health advisory"
+    ),
+}
 
-def apply_future_policy_engine(predictions_df):
+def apply_future_policy_engine(predictions_df, bins=None):
     """
     Applies the future policy engine to a dataframe of predictions.
+
+    `bins` may hold precomputed aqi_bins of predictions_df['predicted_AQI'].
     """
     if predictions_df.empty:
         return predictions_df
-    
-    # Apply logic row by row
-    predictions_df['future_recommended_policies'] = predictions_df.apply(
-        generate_future_policy_recommendations, axis=1
-    )
-    
+
+    # Predicted AQI bins: (-inf, 150], (150, 200], (200, 300], (300, inf)
+    aqi = predictions_df['predicted_AQI'].to_numpy()
+    if bins is None:
+        bins = aqi_bins(aqi)
+    codes = (aqi > 150).astype(np.int8) + bins['high'] + bins['severe']
+    predictions_df['future_recommended_policies'] = pd.Series(
+        codes, index=predictions_df.index
+    ).map(FUTURE_POLICY_RECOMMENDATIONS)
+
     return predictions_df
@@ -1,5 +1,52 @@
+import numpy as np
 import pandas as pd
 
+from modules.preprocessing import aqi_bins
+
+# Policy groups in rule order; bit i of a row's rule code selects group i
+POLICY_GROUPS = [
+    ["Emergency pollution control", "Restrict all heavy vehicles", "Issue public health alert"],  # AQI > 300
+    ["Restrict heavy vehicles", "Divert traffic", "Promote public transport"],  # AQI > 200, high traffic
+    ["Artificial air circulation", "Dust suppression measures"],  # AQI > 200, low wind
+    ["Monitor pollution", "Encourage public transport"],  # 100 <= AQI <= 200
+]
+
+# Precomputed policy string for every combination of rule bits
+POLICY_LOOKUP = np.array([
+    ", ".join(
+        policy
+        for bit, group in enumerate(POLICY_GROUPS) if code >> bit & 1
+        for policy in group
+    ) or "No specific restrictions"
+    for code in range(1 << len(POLICY_GROUPS))
+], dtype=object)
+
+def rule_codes(aqi, traffic, wind_speed, bins=None):
+    """
+    Evaluates the policy rules as column masks and packs them into rule codes.
+
+    Args:
+        aqi (np.ndarray): AQI values.
+        traffic (np.ndarray): Encoded traffic levels (1=Low, 2=Moderate, 3=High).
+        wind_speed (np.ndarray): Wind speeds.
+        bins (dict, optional): Precomputed aqi_bins of aqi.
+
+    Returns:
+        np.ndarray: Index into POLICY_LOOKUP for every row.
+    """
+    if bins is None:
+        bins = aqi_bins(aqi)
+
+    m_emergency = bins['severe']
+    m_high_traffic = bins['high'] & (traffic == 3)
+    m_low_wind = bins['high'] & (wind_speed < 2)
+    m_moderate = (bins['moderate'] | (aqi == 100)) & ~bins['high']
+
+    return (m_emergency.astype(np.int8)
+            | m_high_traffic.astype(np.int8) << 1
+            | m_low_wind.astype(np.int8) << 2
+            | m_moderate.astype(np.int8) << 3)
+
 def generate_policy_recommendations(row):
     """
     Generates policy recommendations for a single row based on AQI and other parameters.
@@ -10,46 +57,27 @@ def generate_policy_recommendations(row):
     Returns:
         str: Comma-separated list of policies.
     """
-    policies = []
-    
-    aqi = row['AQI']
-    traffic = row['traffic_level'] # 1=Low, 2=Moderate, 3=High
-    wind_speed = row['wind_speed']
-    
-    if aqi > 300:
-        policies.append("Emergency pollution control")
-        policies.append("Restrict all heavy vehicles")
-        policies.append("Issue public health alert")
-        
-    if aqi > 200 and traffic == 3: # High traffic
-        policies.append("Restrict heavy vehicles")
-        policies.append("Divert traffic")
-        policies.append("Promote public transport")
-        
-    if aqi > 200 and wind_speed < 2:
-        policies.append("Artificial air circulation")
-        policies.append("Dust suppression measures")
-        
-    if 100 <= aqi <= 200:
-        policies.append("Monitor pollution")
-        policies.append("Encourage public transport")
-        
-    if not policies:
-        policies.append("No specific restrictions")
-        
-    return ", ".join(list(set(policies))) # Remove duplicates if any logic overlaps
+    code = rule_codes(np.array([row['AQI']]), np.array([row['traffic_level']]),
+                      np.array([row['wind_speed']]))[0]
+    return POLICY_LOOKUP[code]
 
-def apply_policy_engine(df):
+def apply_policy_engine(df, bins=None):
     """
     Applies the policy recommendation logic to the entire DataFrame.
     
     Args:
         df (pd.DataFrame): Input DataFrame.
+        bins (dict, optional): Precomputed aqi_bins of df['AQI'].
         
     Returns:
         pd.DataFrame: DataFrame with 'recommended_policies' column.
     """
     print("\n--- Applying Policy Engine ---")
-    df['recommended_policies'] = df.apply(generate_policy_recommendations, axis=1)
+    aqi = df['AQI'].to_numpy()
+    traffic = df['traffic_level'].to_numpy() # 1=Low, 2=Moderate, 3=High
+    wind_speed = df['wind_speed'].to_numpy()
+
+    codes = rule_codes(aqi, traffic, wind_speed, bins)
+    df['recommended_policies'] = POLICY_LOOKUP[codes]
     print("Policy recommendations generated.")
     return df
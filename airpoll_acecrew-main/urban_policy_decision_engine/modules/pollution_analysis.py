@@ -45,7 +45,7 @@ def get_location_statistics(df):
     Returns:
         pd.DataFrame: Grouped statistics.
     """
-    stats = df.groupby('station_name')[['AQI', 'PM2.5', 'PM10']].mean().reset_index()
+    stats = df.groupby('station_name', observed=True)[['AQI', 'PM2.5', 'PM10']].mean().reset_index()
     print("\nLocation Statistics (Average):")
     print(stats)
     return stats
@@ -64,7 +64,7 @@ def identify_pollution_hotspots(df):
     # Requirement says "Return top 10 most polluted locations sorted by AQI"
     # Usually hotspots implies specific areas (stations). Let's aggregate by station first to find hotspot stations.
     
-    station_stats = df.groupby('station_name')['AQI'].mean().reset_index()
+    station_stats = df.groupby('station_name', observed=True)['AQI'].mean().reset_index()
     hotspots = station_stats.sort_values(by='AQI', ascending=False).head(10)
     
     print("\nTop 10 Pollution Hotspots (Average AQI):")
@@ -1,9 +1,12 @@
 import pandas as pd
 import numpy as np
-import pickle
 import os
-import random
+import warnings
+import joblib
 from datetime import timedelta
+from numba import njit
+
+from modules.preprocessing import aqi_bins, RISK_LABELS
 
 # Define paths
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -11,6 +14,9 @@ MODEL_PATH = os.path.join(BASE_DIR, "models", "aqi_prediction_model.pkl")
 
 _model = None
 
+# Shared random generator (PCG64) for forecast simulation noise
+rng = np.random.default_rng()
+
 def load_prediction_model():
     """
     Loads the trained ML model from disk.
@@ -23,152 +29,248 @@ def load_prediction_model():
         if not os.path.exists(MODEL_PATH):
             raise FileNotFoundError(f"Model file not found at {MODEL_PATH}")
             
-        with open(MODEL_PATH, "rb") as f:
-            _model = pickle.load(f)
+        # joblib.load reads both the compressed joblib files and older plain pickles
+        _model = joblib.load(MODEL_PATH)
         print("AQI Prediction Model loaded successfully.")
         return _model
     except Exception as e:
         print(f"Error loading model: {e}")
         return None
 
-def simulate_future_features(current_features, last_features, future_time):
+# Features expected by the model
+FEATURE_ORDER = [
+    'PM2.5', 'PM10', 'NO2', 'SO2', 'CO', 'O3',
+    'temperature', 'humidity', 'wind_speed',
+    'traffic_level_encoded', 'hour', 'day', 'month', 'day_of_week',
+    'AQI_lag_1', 'AQI_lag_2', 'AQI_lag_3', 'AQI_lag_24', 'AQI_rolling_mean_6'
+]
+FEATURE_INDEX = {name: i for i, name in enumerate(FEATURE_ORDER)}
+POLLUTANTS = ['PM2.5', 'PM10', 'NO2', 'CO', 'SO2', 'O3']
+HISTORY_LENGTH = 24 # Longest lag used by the model
+
+# Column indices used by the compiled feature update (frozen as constants by numba)
+_COL_HOUR = FEATURE_INDEX['hour']
+_COL_DAY = FEATURE_INDEX['day']
+_COL_MONTH = FEATURE_INDEX['month']
+_COL_DAY_OF_WEEK = FEATURE_INDEX['day_of_week']
+_COL_TRAFFIC = FEATURE_INDEX['traffic_level_encoded']
+_COL_TEMPERATURE = FEATURE_INDEX['temperature']
+_COL_HUMIDITY = FEATURE_INDEX['humidity']
+_COL_WIND = FEATURE_INDEX['wind_speed']
+_POLLUTANT_COLS = np.array([FEATURE_INDEX[p] for p in POLLUTANTS], dtype=np.int64)
+
+def model_input_columns(model):
     """
-    Simulates feature values for a future timestamp based on logic and randomness.
+    Returns the FEATURE_ORDER column indices in the order the model was fitted
+    with, or None if the feature array can be passed to the model as is.
+    """
+    fitted_names = getattr(model, 'feature_names_in_', None)
+    if fitted_names is None or list(fitted_names) == FEATURE_ORDER:
+        return None
+    return np.array([FEATURE_INDEX[name] for name in fitted_names])
+
+def predict_array(model, features, columns=None):
+    """
+    Calls `model.predict` on the raw feature array, skipping the DataFrame
+    construction that feature-name validation would otherwise require.
+    """
+    if columns is not None:
+        features = features[:, columns]
+    with warnings.catch_warnings():
+        # Models fitted on a DataFrame warn when given an ndarray; the column
+        # order has already been matched to feature_names_in_ above.
+        warnings.filterwarnings("ignore", message="X does not have valid feature names")
+        return model.predict(features)
+
+@njit(cache=True)
+def _update_features(features, hour, day, month, day_of_week,
+                     temperature_step, humidity_step, wind_step, drift):
+    """
+    Compiled per-hour feature update, mutating `features` row by row in a
+    single fused loop. The random steps are drawn by the caller.
     """
-    # 1. Update Time Features
-    current_features['hour'] = future_time.hour
-    current_features['day'] = future_time.day
-    current_features['month'] = future_time.month
-    current_features['day_of_week'] = future_time.dayofweek
-    
-    # 2. Simulate Traffic based on Hour
     # Rush hours: 8-11am (8-11), 5-8pm (17-20)
-    hour = future_time.hour
     if 8 <= hour <= 11 or 17 <= hour <= 20:
-        current_features['traffic_level_encoded'] = 3 # High
+        traffic_level = 3 # High
+        traffic_factor = 1.05
     elif 12 <= hour <= 16 or 21 <= hour <= 22:
-        current_features['traffic_level_encoded'] = 2 # Moderate
+        traffic_level = 2 # Moderate
+        traffic_factor = 1.0
     else:
-        current_features['traffic_level_encoded'] = 1 # Low
-
-    # 3. Simulate Weather (Random Walk)
-    # Add small random variation to previous step's values
-    current_features['temperature'] = last_features['temperature'] + random.uniform(-0.5, 0.5)
-    current_features['humidity'] = max(0, min(100, last_features['humidity'] + random.uniform(-2, 2)))
-    current_features['wind_speed'] = max(0, last_features['wind_speed'] + random.uniform(-0.5, 0.5))
-
-    # 4. Simulate Pollutants (PM2.5, etc) loosely based on Traffic
-    # If traffic is high, pollutants tend to increase, else decrease
-    # utilizing a simplified factor
-    traffic_factor = 1.0 if current_features['traffic_level_encoded'] > 1 else 0.95
-    if current_features['traffic_level_encoded'] == 3:
-        traffic_factor = 1.05
-    
-    pollutants = ['PM2.5', 'PM10', 'NO2', 'CO', 'SO2', 'O3']
-    for p in pollutants:
-        # random drift + traffic influence
-        drift = random.uniform(-0.02, 0.02)
-        current_features[p] = max(0, last_features[p] * traffic_factor * (1 + drift))
-    
-    return current_features
+        traffic_level = 1 # Low
+        traffic_factor = 0.95
 
-def predict_future_aqi(df, hours_ahead=24):
+    for s in range(features.shape[0]):
+        row = features[s]
+        row[_COL_HOUR] = hour
+        row[_COL_DAY] = day
+        row[_COL_MONTH] = month
+        row[_COL_DAY_OF_WEEK] = day_of_week
+        row[_COL_TRAFFIC] = traffic_level
+
+        row[_COL_TEMPERATURE] += temperature_step[s]
+        humidity = row[_COL_HUMIDITY] + humidity_step[s]
+        if humidity < 0:
+            humidity = 0.0
+        elif humidity > 100:
+            humidity = 100.0
+        row[_COL_HUMIDITY] = humidity
+        wind = row[_COL_WIND] + wind_step[s]
+        if wind < 0:
+            wind = 0.0
+        row[_COL_WIND] = wind
+
+        for j in range(_POLLUTANT_COLS.shape[0]):
+            value = row[_POLLUTANT_COLS[j]] * traffic_factor * (1 + drift[s, j])
+            if value < 0:
+                value = 0.0
+            row[_POLLUTANT_COLS[j]] = value
+
+def simulate_future_features(features, future_time, generator=rng):
+    """
+    Simulates feature values for a future timestamp based on logic and randomness.
+
+    `features` is an (n_stations, len(FEATURE_ORDER)) array holding the previous
+    step's features; it is updated in place for all stations at once using
+    random draws from `generator`.
+    """
+    n_stations = features.shape[0]
+
+    # Weather random walk steps and pollutant drift; traffic follows the hour
+    # and scales the pollutants (see _update_features)
+    temperature_step = generator.uniform(-0.5, 0.5, n_stations)
+    humidity_step = generator.uniform(-2, 2, n_stations)
+    wind_step = generator.uniform(-0.5, 0.5, n_stations)
+    drift = generator.uniform(-0.02, 0.02, (n_stations, len(POLLUTANTS)))
+
+    _update_features(
+        features, future_time.hour, future_time.day, future_time.month,
+        future_time.dayofweek, temperature_step, humidity_step, wind_step, drift
+    )
+    return features
+
+def forecast_stations(model, station_frames, latest_timestamp, hours_ahead, generator):
+    """
+    Recursively forecasts `hours_ahead` hours for a batch of stations.
+
+    `station_frames` is a list of (station_name, station_df) pairs, each
+    station_df sorted by timestamp.
+
+    Each hourly step simulates features and calls `model.predict` once for the
+    whole (n_stations, n_features) batch.
+    """
+    stations = [station for station, _ in station_frames]
+    n_stations = len(stations)
+    col = FEATURE_INDEX
+
+    # History buffer per station: [t-24, ..., t-1 | hour 1, ..., hour N]
+    history = np.empty((n_stations, HISTORY_LENGTH + hours_ahead), dtype=np.float64)
+    features = np.full((n_stations, len(FEATURE_ORDER)), np.nan)
+
+    for s, (_, station_df) in enumerate(station_frames):
+        # Build the lag buffer from this station's history
+        # We need at least 24 hours of history to properly initialize lags
+        # If not available, we pad with the last known value
+        history_values = station_df['AQI'].to_numpy(dtype=np.float64)[-HISTORY_LENGTH:]
+        history[s, :HISTORY_LENGTH] = history_values[-1]
+        history[s, HISTORY_LENGTH - len(history_values):HISTORY_LENGTH] = history_values
+
+    # Initialize current features from each station's last known data point,
+    # gathering the last rows once and writing the present columns as a block
+    last_rows = pd.concat([station_df.iloc[[-1]] for _, station_df in station_frames])
+    present = [name for name in FEATURE_ORDER if name in last_rows.columns]
+    features[:, [col[name] for name in present]] = last_rows[present].to_numpy(dtype=np.float64)
+    latitudes = last_rows['latitude'].to_numpy(dtype=np.float64)
+    longitudes = last_rows['longitude'].to_numpy(dtype=np.float64)
+
+    # Ensure traffic_level_encoded is present
+    if 'traffic_level_encoded' not in last_rows.columns:
+        features[:, col['traffic_level_encoded']] = 2 # Default
+
+    model_columns = model_input_columns(model)
+
+    # Rolling 6-hour sum, updated incrementally as predictions are appended
+    rolling_sum_6 = history[:, HISTORY_LENGTH - 6:HISTORY_LENGTH].sum(axis=1)
+    future_times = [latest_timestamp + timedelta(hours=i) for i in range(1, hours_ahead + 1)]
+
+    for i, future_time in enumerate(future_times):
+        t = HISTORY_LENGTH + i
+
+        # 1. Simulate Features (Weather, Traffic, Pollutants)
+        simulate_future_features(features, future_time, generator)
+
+        # 2. Calculate Lags and Rolling Mean from History
+        lag_1 = history[:, t - 1]
+        features[:, col['AQI_lag_1']] = lag_1
+        features[:, col['AQI_lag_2']] = history[:, t - 2]
+        features[:, col['AQI_lag_3']] = history[:, t - 3]
+        features[:, col['AQI_lag_24']] = history[:, t - 24]
+        features[:, col['AQI_rolling_mean_6']] = rolling_sum_6 / 6
+
+        # 3. Predict AQI for all stations
+        try:
+            predicted_aqi = predict_array(model, features, model_columns)
+
+            # Add controlled randomness to prevent flat lines if model is too stable
+            predicted_aqi = predicted_aqi + generator.uniform(-5, 5, n_stations)
+            predicted_aqi = np.maximum(0, predicted_aqi) # Ensure non-negative
+
+        except Exception as e:
+            print(f"Prediction error at {future_time}: {e}")
+            predicted_aqi = lag_1 # Fallback to previous value
+
+        # 4. Update History (the value at t-6 leaves the rolling window)
+        history[:, t] = predicted_aqi
+        rolling_sum_6 += history[:, t] - history[:, t - 6]
+
+    # 5. Assemble Results (station-major, one row per station and hour) from
+    # preallocated typed columns
+    n_rows = n_stations * hours_ahead
+    predicted_float = history[:, HISTORY_LENGTH:].ravel()
+    predicted = np.empty(n_rows, dtype=np.int32)
+    predicted[:] = predicted_float # truncates like int(); display column only
+    future_timestamps = np.tile(pd.DatetimeIndex(future_times).to_numpy(), n_stations)
+    station_names = np.empty(n_rows, dtype=object)
+    station_names[:] = np.repeat(np.array(stations, dtype=object), hours_ahead)
+
+    # Risk is classified on the untruncated forecast (100.5 is "Moderate")
+    bins = aqi_bins(predicted_float)
+    risk_level = RISK_LABELS[bins['moderate'].astype(np.int8) + bins['high'] + bins['severe']]
+
+    return pd.DataFrame({
+        'station_name': station_names,
+        'future_timestamp': future_timestamps,
+        'predicted_AQI': predicted,
+        'risk_level': risk_level,
+        'latitude': np.repeat(latitudes, hours_ahead),
+        'longitude': np.repeat(longitudes, hours_ahead)
+    })
+
+def predict_future_aqi(df, hours_ahead=24, seed=None):
     """
     Predicts AQI for the next `hours_ahead` hours using recursive forecasting.
+
+    All stations are forecast together: each hourly step is one batched
+    `model.predict` call. `seed` fixes the random feature simulation, so a
+    seeded forecast is reproducible.
+
+    `df['timestamp']` must already be datetime64 (converted once at load time).
     """
     model = load_prediction_model()
     if model is None:
         return pd.DataFrame()
 
-    latest_timestamp = pd.to_datetime(df['timestamp']).max()
-    unique_stations = df['station_name'].unique()
-    future_predictions = []
-
-    # Features expected by the model
-    feature_order = [
-        'PM2.5', 'PM10', 'NO2', 'SO2', 'CO', 'O3',
-        'temperature', 'humidity', 'wind_speed',
-        'traffic_level_encoded', 'hour', 'day', 'month', 'day_of_week',
-        'AQI_lag_1', 'AQI_lag_2', 'AQI_lag_3', 'AQI_lag_24', 'AQI_rolling_mean_6'
-    ]
-
-    for station in unique_stations:
-        # Get historical data for this station to build lag buffer
-        station_df = df[df['station_name'] == station].sort_values(by='timestamp')
-        if station_df.empty:
-            continue
-            
-        # We need at least 24 hours of history to properly initialize lags
-        # If not available, we pad with the last known value
-        history_values = station_df['AQI'].tolist()
-        if len(history_values) < 24:
-            # Pad with the last value if history is short (edge case)
-            history_values = [history_values[-1]] * (24 - len(history_values)) + history_values
-
-        last_row = station_df.iloc[-1]
-        
-        # Initialize current features from the last known data point
-        current_features = {col: last_row[col] for col in feature_order if col in last_row}
-        # Ensure traffic_level_encoded is present
-        if 'traffic_level_encoded' not in current_features:
-             current_features['traffic_level_encoded'] = 2 # Default
-        
-        # Helper to maintain features for next iteration simulation
-        last_simulated_features = current_features.copy()
-
-        for i in range(1, hours_ahead + 1):
-            future_time = latest_timestamp + timedelta(hours=i)
-            
-            # 1. Simulate Features (Weather, Traffic, Pollutants)
-            last_simulated_features = simulate_future_features(last_simulated_features.copy(), last_simulated_features, future_time)
-            
-            # 2. Calculate Lags and Rolling Mean from History
-            # History buffer: [... t-25, t-24, ... t-3, t-2, t-1]
-            lag_1 = history_values[-1]
-            lag_2 = history_values[-2]
-            lag_3 = history_values[-3]
-            lag_24 = history_values[-24]
-            rolling_mean_6 = np.mean(history_values[-6:])
-            
-            # 3. Construct Feature Vector for Model
-            input_features = last_simulated_features.copy()
-            input_features['AQI_lag_1'] = lag_1
-            input_features['AQI_lag_2'] = lag_2
-            input_features['AQI_lag_3'] = lag_3
-            input_features['AQI_lag_24'] = lag_24
-            input_features['AQI_rolling_mean_6'] = rolling_mean_6
-            
-            # Ensure correct order
-            feature_vector = pd.DataFrame([input_features])[feature_order]
-            
-            # 4. Predict AQI
-            try:
-                predicted_aqi = model.predict(feature_vector)[0]
-                
-                # Add controlled randomness to prevent flat lines if model is too stable
-                predicted_aqi += random.uniform(-5, 5)
-                predicted_aqi = max(0, predicted_aqi) # Ensure non-negative
-                
-            except Exception as e:
-                print(f"Prediction error for {station} at {future_time}: {e}")
-                predicted_aqi = lag_1 # Fallback to previous value
-            
-            # 5. Update History
-            history_values.append(predicted_aqi)
-            
-            # 6. Store Result
-            risk_level = "Low"
-            if predicted_aqi > 300: risk_level = "Severe"
-            elif predicted_aqi > 200: risk_level = "High"
-            elif predicted_aqi > 100: risk_level = "Moderate"
-
-            future_predictions.append({
-                'station_name': station,
-                'future_timestamp': future_time,
-                'predicted_AQI': int(predicted_aqi),
-                'risk_level': risk_level,
-                'latitude': last_row['latitude'], 
-                'longitude': last_row['longitude']
-            })
-
-    return pd.DataFrame(future_predictions)
+    latest_timestamp = df['timestamp'].max()
+
+    # Split the history per station in a single groupby pass
+    # (station_name is categorical, so grouping works on integer codes)
+    station_frames = list(
+        df.sort_values(by='timestamp').groupby('station_name', sort=False, observed=True)
+    )
+    if not station_frames:
+        return pd.DataFrame()
+
+    return forecast_stations(
+        model, station_frames, latest_timestamp, hours_ahead,
+        np.random.default_rng(seed)
+    )
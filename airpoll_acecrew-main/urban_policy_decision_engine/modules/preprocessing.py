@@ -1,5 +1,28 @@
+import numpy as np
 import pandas as pd
 
+RISK_LABELS = np.array(['Low', 'Moderate', 'High', 'Severe'], dtype=object)
+
+# Columns left in float64: coordinates lose metres in float32, and the AQI
+# values and wind speed are compared against policy thresholds, where
+# rounding could move a reading across a bin edge
+FLOAT64_COLUMNS = ['latitude', 'longitude', 'AQI', 'predicted_AQI',
+                   'AQI_reduction_percent', 'wind_speed']
+
+def aqi_bins(aqi):
+    """
+    Evaluates the shared AQI threshold masks once so the risk classifier and
+    the policy engines can reuse them instead of rescanning the column.
+
+    Args:
+        aqi (np.ndarray): AQI values.
+
+    Returns:
+        dict: Boolean masks 'severe' (> 300), 'high' (> 200), 'moderate' (> 100).
+    """
+    aqi = np.asarray(aqi)
+    return {'severe': aqi > 300, 'high': aqi > 200, 'moderate': aqi > 100}
+
 def preprocess_dataset(df):
     """
     Preprocesses the dataset: converts timestamps, sorts, handles duplicates.
@@ -39,32 +62,36 @@ def preprocess_dataset(df):
     # Simple fillna for numeric columns with mean if any exist (though simulated data is clean)
     df[numeric_cols] = df[numeric_cols].fillna(df[numeric_cols].mean())
 
+    # Downcast the remaining readings to float32 and labels to categories to halve the frame size
+    float_cols = df.select_dtypes('float64').columns.difference(FLOAT64_COLUMNS)
+    df[float_cols] = df[float_cols].astype('float32')
+    for col in ['station_id', 'station_name', 'city', 'state', 'traffic_level']:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+
     print("Preprocessing complete.")
     return df
 
-def classify_risk_levels(df):
+def classify_risk_levels(df, bins=None):
     """
     Classifies AQI into risk levels.
     
     Args:
         df (pd.DataFrame): DataFrame with 'AQI' column.
+        bins (dict, optional): Precomputed aqi_bins of df['AQI'].
         
     Returns:
         pd.DataFrame: DataFrame with new 'risk_level' column.
     """
     print("Classifying risk levels...")
     
-    def get_risk(aqi):
-        if aqi <= 100:
-            return 'Low'
-        elif aqi <= 200:
-            return 'Moderate'
-        elif aqi <= 300:
-            return 'High'
-        else:
-            return 'Severe'
-            
-    df['risk_level'] = df['AQI'].apply(get_risk)
+    aqi = df['AQI'].to_numpy()
+    if bins is None:
+        bins = aqi_bins(aqi)
+    # The masks are nested, so their sum is the index of the risk label
+    level = bins['moderate'].astype(np.int8) + bins['high'] + bins['severe']
+    # A missing AQI fails every comparison and would read as 'Low'; keep it missing
+    df['risk_level'] = np.where(pd.isna(aqi), np.nan, RISK_LABELS[level])
     print("Risk levels classified.")
     return df
 
@@ -84,19 +111,13 @@ def encode_traffic_levels(df):
     """
     print("Encoding traffic levels...")
     
-    mapping = {'Low': 1, 'Moderate': 2, 'High': 3}
-    # Using map for direct replacement, filling unknown with 0 or keeping as is if needed
-    # Assuming data is clean as per requirements
-    df['traffic_level_encoded'] = df['traffic_level'].map(mapping)
-    
-    # If original column needs to be replaced, we can do:
-    # df['traffic_level'] = df['traffic_level'].map(mapping)
-    # But usually keeping original is good for readability, taking requirement literally:
-    # "Convert traffic_level" usually implies transformation. Let's update the specific column if used for analysis, 
-    # but the prompt asked to "Convert traffic_level: Low -> 1...". 
-    # I will replace the column values to strictly follow "Convert".
-    
-    df['traffic_level'] = df['traffic_level'].map(mapping).fillna(0).astype(int)
+    # Category codes follow the order below, so codes + 1 gives Low=1, Moderate=2, High=3
+    # and unknown labels (code -1) become 0
+    levels = pd.Categorical(df['traffic_level'], categories=['Low', 'Moderate', 'High'], ordered=True)
+    df['traffic_level_encoded'] = levels.codes.astype(int) + 1
+
+    # "Convert traffic_level" is taken literally: the column is replaced by its encoding
+    df['traffic_level'] = df['traffic_level_encoded']
     
     print("Traffic levels encoded.")
     return df
@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 
 def simulate_policy_impact(row):
@@ -66,6 +67,25 @@ def apply_simulation(df):
         pd.DataFrame: DataFrame with 'predicted_AQI' and 'AQI_reduction_percent'.
     """
     print("\n--- Applying Simulation Engine ---")
-    df[['predicted_AQI', 'AQI_reduction_percent']] = df.apply(simulate_policy_impact, axis=1)
+    pm25 = df['PM2.5'].to_numpy(dtype=np.float64)
+    pm10 = df['PM10'].to_numpy(dtype=np.float64)
+    aqi = df['AQI'].to_numpy(dtype=np.float64)
+
+    # Same reductions as simulate_policy_impact, applied to whole columns
+    traffic_high = df['traffic_level'].to_numpy() == 3
+    pm25_new = np.where(traffic_high, pm25 * 0.80, pm25)
+    pm10_new = np.where(traffic_high, pm10 * 0.85, pm10)
+    wind_reduction_factor = np.where(df['wind_speed'].to_numpy() < 2, 0.90, 1.0)
+
+    orig_pm_avg = (pm25 + pm10) / 2
+    orig_pm_avg = np.where(orig_pm_avg == 0, 1, orig_pm_avg) # Avoid div zero
+    pm_reduction_ratio = ((pm25_new + pm10_new) / 2) / orig_pm_avg
+
+    predicted_aqi = np.minimum(aqi * pm_reduction_ratio * wind_reduction_factor, aqi)
+    reduction_percent = np.divide(aqi - predicted_aqi, aqi,
+                                  out=np.zeros_like(aqi), where=aqi > 0) * 100
+
+    df['predicted_AQI'] = np.round(predicted_aqi)
+    df['AQI_reduction_percent'] = np.round(reduction_percent, 2)
     print("Simulation complete.")
     return df
@@ -19,12 +19,15 @@ Usage:
 
 import io
 import sys
+import threading
 import time
 
 import cv2
 import numpy as np
 import matplotlib
 import matplotlib.pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 import streamlit as st
 from PIL import Image
 
@@ -399,19 +402,22 @@ button[kind="primary"] {
 # =====================================================================
 # CACHED MODEL
 # =====================================================================
-@st.cache_resource
+@st.cache_resource(show_spinner=False)
 def get_model():
     """Load or train the PSI model (cached for the session lifetime)."""
     return load_model()
 
 
+# Warm the cache at script start so the first upload does not pay for loading
+get_model()
+
+
 # =====================================================================
 # HELPERS
 # =====================================================================
 
-def pil_to_bgr(pil_img: Image.Image) -> np.ndarray:
-    """PIL Image -> OpenCV BGR array."""
-    return cv2.cvtColor(np.array(pil_img.convert("RGB")), cv2.COLOR_RGB2BGR)
+# Jet colourmap as a 256-entry RGB lookup table, evaluated once at import
+JET_LUT = (plt.cm.jet(np.arange(256))[:, :3] * 255).astype(np.uint8)
 
 
 def render_haze_map(haze_map: np.ndarray) -> np.ndarray:
@@ -419,31 +425,63 @@ def render_haze_map(haze_map: np.ndarray) -> np.ndarray:
     Render the haze map as a colour-mapped RGB image (no axes / chrome).
     Blue-Green = clear, Yellow-Red = hazy.
     """
-    # Apply colourmap directly (avoids Matplotlib figure overhead)
-    colormapped = plt.cm.jet(haze_map)[:, :, :3]  # Drop alpha
-    return (colormapped * 255).astype(np.uint8)
+    # Same binning as plt.cm.jet on floats (256 bins, 1.0 in the last one),
+    # done as one table gather instead of evaluating the colourmap per pixel
+    index = np.minimum(np.clip(haze_map, 0.0, 1.0) * 256, 255).astype(np.uint8)
+    return JET_LUT[index]
 
 
-def render_haze_map_with_bar(haze_map: np.ndarray) -> np.ndarray:
-    """Render haze map with a colourbar as a complete figure."""
-    h, w = haze_map.shape
-    aspect = h / w
-    fig_w = 5
-    fig_h = fig_w * aspect
-    fig, ax = plt.subplots(figsize=(fig_w, fig_h))
-    im = ax.imshow(haze_map, cmap="jet", vmin=0.0, vmax=1.0)
-    ax.axis("off")
-    cbar = fig.colorbar(im, ax=ax, fraction=0.046, pad=0.03, shrink=0.85)
+COLORBAR_WIDTH_PX = 90
+COLORBAR_DPI = 130
+
+
+def _build_colorbar_figure() -> Figure:
+    """Build the colourbar figure once; later renders only resize and redraw it."""
+    fig = Figure(figsize=(COLORBAR_WIDTH_PX / COLORBAR_DPI, 4), dpi=COLORBAR_DPI,
+                 facecolor="white")
+    FigureCanvasAgg(fig)
+    cax = fig.add_axes([0.08, 0.075, 0.22, 0.85])
+    mappable = matplotlib.cm.ScalarMappable(
+        norm=matplotlib.colors.Normalize(vmin=0.0, vmax=1.0), cmap="jet")
+    cbar = fig.colorbar(mappable, cax=cax)
     cbar.ax.tick_params(labelsize=8)
     cbar.set_label("Haze Intensity", fontsize=9)
-    fig.tight_layout(pad=0.3)
+    return fig
+
 
-    buf = io.BytesIO()
-    fig.savefig(buf, format="png", dpi=130, bbox_inches="tight",
-                facecolor="white", edgecolor="none")
-    plt.close(fig)
-    buf.seek(0)
-    return np.array(Image.open(buf))
+_COLORBAR_FIG = _build_colorbar_figure()
+# Streamlit sessions run on separate threads; the shared figure is not thread-safe
+_COLORBAR_LOCK = threading.Lock()
+
+
+@st.cache_resource
+def get_colorbar_strip(height: int) -> np.ndarray:
+    """
+    Pre-rendered "Haze Intensity" colourbar strip (RGB) of the given pixel
+    height, drawn from the shared figure once per height, then reused.
+    """
+    with _COLORBAR_LOCK:
+        _COLORBAR_FIG.set_size_inches(COLORBAR_WIDTH_PX / COLORBAR_DPI,
+                                      height / COLORBAR_DPI)
+        # Rasterise straight from the Agg canvas (no PNG encode / decode)
+        _COLORBAR_FIG.canvas.draw()
+        strip = np.asarray(_COLORBAR_FIG.canvas.buffer_rgba())[:, :, :3].copy()
+    if strip.shape[0] != height:
+        strip = cv2.resize(strip, (strip.shape[1], height),
+                           interpolation=cv2.INTER_AREA)
+    return strip
+
+
+def render_haze_map_with_bar(haze_map: np.ndarray) -> np.ndarray:
+    """
+    Render the haze map with a colourbar beside it.
+
+    The map is colourised through JET_LUT (the same Matplotlib jet the
+    colourbar is drawn with) and joined to a cached colourbar strip, so no
+    Matplotlib figure is built per image.
+    """
+    rgb = render_haze_map(haze_map)
+    return np.hstack([rgb, get_colorbar_strip(rgb.shape[0])])
 
 
 def get_psi_color(cat: str) -> str:
@@ -471,19 +509,29 @@ def run_pipeline(pil_image: Image.Image) -> dict:
     t0 = time.time()
 
     # --- Step 1: Preprocess ---
-    bgr = pil_to_bgr(pil_image)
-    h, w = bgr.shape[:2]
+    # The haze steps only take minima / sums over the colour channels, so they
+    # run on the RGB pixels directly (no BGR conversion copy)
+    if pil_image.mode != "RGB":
+        pil_image = pil_image.convert("RGB")
+    rgb = np.ascontiguousarray(np.asarray(pil_image, dtype=np.uint8))
+    h, w = rgb.shape[:2]
     scale = 640 / max(h, w)
     if scale < 1.0:
-        bgr = cv2.resize(bgr, (int(w * scale), int(h * scale)),
-                         interpolation=cv2.INTER_AREA)
-    blurred = cv2.GaussianBlur(bgr, (3, 3), 0)
-    original_rgb = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
+        # Halve with pyrDown (pre-filtered, SIMD) while the image is at least
+        # twice the target, then finish with a cheap linear resize
+        target = (int(w * scale), int(h * scale))
+        while max(rgb.shape[:2]) >= 2 * 640:
+            rgb = cv2.pyrDown(rgb)
+        if (rgb.shape[1], rgb.shape[0]) != target:
+            rgb = cv2.resize(rgb, target, interpolation=cv2.INTER_LINEAR)
+    original_rgb = rgb
 
     # --- Step 2: Haze estimation ---
-    dc = compute_dark_channel(blurred)
-    atm = estimate_atmospheric_light(blurred, dc)
-    trans = compute_transmission_map(blurred, atm)
+    # No pre-blur: the dark channel's 15x15 min filter already suppresses
+    # pixel noise, so a 3x3 smoothing pass barely changes its output
+    dc = compute_dark_channel(rgb)
+    atm = estimate_atmospheric_light(rgb, dc)
+    trans = compute_transmission_map(rgb, atm)
     haze = compute_haze_map(trans)
 
     # --- Step 3: Features ---
@@ -509,6 +557,18 @@ def run_pipeline(pil_image: Image.Image) -> dict:
     }
 
 
+@st.cache_data(show_spinner=False)
+def analyze_image(image_bytes: bytes) -> dict:
+    """
+    Run the pipeline on the raw uploaded bytes.
+
+    Cached on the file content, so the Streamlit reruns triggered by every
+    widget interaction return the previous result instead of recomputing it.
+    """
+    pil_image = Image.open(io.BytesIO(image_bytes)).convert("RGB")
+    return run_pipeline(pil_image)
+
+
 # =====================================================================
 # MAIN UI
 # =====================================================================
@@ -552,8 +612,10 @@ def main():
         return
 
     # ───────────────── VALIDATE ─────────────────
+    image_bytes = uploaded.getvalue()
     try:
-        pil_image = Image.open(uploaded).convert("RGB")
+        # Header check only; the full decode happens (once) in analyze_image
+        Image.open(io.BytesIO(image_bytes)).verify()
     except Exception as e:
         st.error(f"Could not read the uploaded file: {e}")
         return
@@ -569,7 +631,12 @@ def main():
     </div>
     """, unsafe_allow_html=True)
 
-    result = run_pipeline(pil_image)
+    try:
+        result = analyze_image(image_bytes)
+    except Exception as e:
+        status.empty()
+        st.error(f"Could not read the uploaded file: {e}")
+        return
     status.empty()
 
     # ───────────────── RESULTS HEADER ─────────────────
@@ -718,7 +785,7 @@ def main():
 ### Pipeline
 
 ```
-Image Upload  →  Resize + Blur  →  Dark Channel Prior  →  Atmospheric Light
+Image Upload  →  Resize         →  Dark Channel Prior  →  Atmospheric Light
                                          ↓
                                   Transmission Map t(x)
                                          ↓
@@ -0,0 +1,64 @@
+"""
+=============================================================================
+AHEAD-OF-TIME KERNEL BUILD
+=============================================================================
+Purpose:
+    Compile the Numba kernels of the pipeline (haze map, features and the
+    packed PSI forest walk) into a C extension module (`airwana_kernels`)
+    so that `main.py` and `app.py` start with no JIT warm-up at all.
+
+    This step is OPTIONAL.  When the extension is absent,
+    `haze_estimation`, `feature_extraction` and `psi_model` fall back to
+    their `@njit(cache=True)` kernels, which compile once and are then
+    loaded from Numba's on-disk cache.
+
+    AOT kernels are compiled single-threaded (`prange` runs as `range`).
+
+Usage:
+    python build_kernels.py     # Writes airwana_kernels.*.so next to this file
+=============================================================================
+"""
+
+import os
+
+from numba.pycc import CC
+
+import feature_extraction
+import haze_estimation
+import psi_model
+
+AOT_MODULE = "airwana_kernels"
+
+
+def build(output_dir: str = None) -> None:
+    """
+    Export each hot kernel with an explicit signature and compile them
+    into one extension module.
+
+    Args:
+        output_dir: Where to write the extension (default: this directory).
+    """
+    cc = CC(AOT_MODULE)
+    cc.output_dir = output_dir or os.path.dirname(os.path.abspath(__file__))
+
+    # The JIT dispatchers keep the plain Python function in `.py_func`
+    cc.export("channel_min_u8", "f4[:,:](u1[:,:,:])")(
+        haze_estimation._channel_min_u8.py_func)
+    cc.export("normalised_channel_min", "f4[:,:](u1[:,:,:], f8[:])")(
+        haze_estimation._normalised_channel_min.py_func)
+    cc.export("transmission_inplace", "void(f4[:,:], f4)")(
+        haze_estimation._transmission_inplace.py_func)
+    cc.export("haze_stats_f4", "UniTuple(f8, 4)(f4[:])")(
+        feature_extraction._haze_stats.py_func)
+    cc.export("haze_stats_f8", "UniTuple(f8, 4)(f8[:])")(
+        feature_extraction._haze_stats.py_func)
+    cc.export("forest_predict",
+              "f8(f4[:], i1[:], f4[:], i4[:], i4[:], f8[:], i4[:])")(
+        psi_model._forest_predict.py_func)
+
+    cc.compile()
+    print(f"[Kernels] Built {AOT_MODULE} in {cc.output_dir}")
+
+
+if __name__ == "__main__":
+    build()
@@ -33,6 +33,41 @@ Design Notes:
 """
 
 import numpy as np
+from numba import njit
+
+
+@njit(cache=True, fastmath=True, boundscheck=False)
+def _haze_stats(flat: np.ndarray) -> tuple:
+    """
+    Sum, sum of squares, min and max of a flat haze map in one streaming
+    pass (no temporaries, one read of the data).
+    """
+    s = 0.0
+    ss = 0.0
+    mn = np.inf
+    mx = -np.inf
+    for i in range(flat.shape[0]):
+        x = flat[i]
+        s += x
+        ss += x * x
+        if x < mn:
+            mn = x
+        if x > mx:
+            mx = x
+    return s, ss, mn, mx
+
+
+# Prefer the ahead-of-time compiled kernels (`python build_kernels.py`),
+# which need no first-run compile; fall back to the cached JIT kernel above
+try:
+    import airwana_kernels as _aot
+
+    def _stats(flat: np.ndarray) -> tuple:
+        if flat.dtype == np.float32:
+            return _aot.haze_stats_f4(flat)
+        return _aot.haze_stats_f8(flat.astype(np.float64, copy=False))
+except ImportError:
+    _stats = _haze_stats
 
 
 def extract_haze_features(haze_map: np.ndarray) -> dict:
@@ -40,18 +75,23 @@ def extract_haze_features(haze_map: np.ndarray) -> dict:
     Extract numeric haze descriptors from the haze intensity map.
 
     Args:
-        haze_map: 2-D float64 array with values in [0, 1].
+        haze_map: 2-D float32 (or float64) array with values in [0, 1].
                   Output of `haze_estimation.compute_haze_map()`.
 
     Returns:
         Dictionary of named features (all float values).
     """
+    # All four features come from a single pass over the map
+    # (sum, sum of squares, min, max)
+    s, ss, mn, mx = _stats(np.ascontiguousarray(haze_map).ravel())
+    n = haze_map.size
+
     # -----------------------------------------------------------------------
     # Feature 1: MEAN HAZE INTENSITY
     # -----------------------------------------------------------------------
     # The single most informative feature.  Represents the average
     # fraction of light scattered by the atmosphere across the image.
-    mean_haze = float(np.mean(haze_map))
+    mean_haze = s / n
 
     # -----------------------------------------------------------------------
     # Feature 2: HAZE VARIANCE
@@ -59,26 +99,28 @@ def extract_haze_features(haze_map: np.ndarray) -> dict:
     # Quantifies spatial uniformity.
     # Uniform haze (e.g., heavy smog) → low variance.
     # Patchy haze (e.g., partial cloud cover) → high variance.
-    haze_variance = float(np.var(haze_map))
+    haze_variance = max(ss / n - mean_haze * mean_haze, 0.0)
 
     # -----------------------------------------------------------------------
     # Feature 3: MAXIMUM HAZE
     # -----------------------------------------------------------------------
     # Captures the densest haze region — useful for worst-case estimation.
-    max_haze = float(np.max(haze_map))
+    max_haze = float(mx)
 
     # -----------------------------------------------------------------------
     # Feature 4: CONTRAST (max − min)
     # -----------------------------------------------------------------------
     # If contrast is very low AND mean is high, the scene is a near-
     # total whiteout — very poor air quality.
-    contrast = float(np.max(haze_map) - np.min(haze_map))
+    contrast = float(mx - mn)
 
+    # Full precision here; rounding is a display concern left to the
+    # formatting in main.py / output_handler.py / app.py
     features = {
-        "mean_haze": round(mean_haze, 4),
-        "haze_variance": round(haze_variance, 6),
-        "max_haze": round(max_haze, 4),
-        "contrast": round(contrast, 4),
+        "mean_haze": mean_haze,
+        "haze_variance": haze_variance,
+        "max_haze": max_haze,
+        "contrast": contrast,
     }
 
     return features
@@ -95,11 +137,12 @@ def features_to_vector(features: dict) -> np.ndarray:
         features: Output of `extract_haze_features()`.
 
     Returns:
-        NumPy array of shape (4,).
+        NumPy array of shape (4,), float32 (the dtype scikit-learn's tree
+        models convert their input to anyway).
     """
-    return np.array([
-        features["mean_haze"],
-        features["haze_variance"],
-        features["max_haze"],
-        features["contrast"],
-    ])
+    vector = np.empty(4, dtype=np.float32)
+    vector[0] = features["mean_haze"]
+    vector[1] = features["haze_variance"]
+    vector[2] = features["max_haze"]
+    vector[3] = features["contrast"]
+    return vector
@@ -29,40 +29,33 @@ import cv2
 import numpy as np
 
 
-def generate_urban_scene(width: int = 640,
-                         height: int = 480,
-                         haze_level: float = 0.4) -> np.ndarray:
+def _build_scene(width: int = 640, height: int = 480) -> np.ndarray:
     """
-    Generate a synthetic urban scene with controllable haze.
+    Build the haze-free synthetic urban scene.
 
     The scene has three regions:
         1. Sky (top 40%)   — blue-to-white gradient
         2. Buildings (mid) — dark rectangular silhouettes
         3. Road (bottom)   — grey surface
 
-    Haze is simulated by blending the scene toward a white "atmospheric
-    light" proportional to the haze_level parameter.
-
     Args:
-        width:      Image width in pixels.
-        height:     Image height in pixels.
-        haze_level: Float in [0, 1].  0 = perfectly clear, 1 = whiteout.
+        width:  Image width in pixels.
+        height: Image height in pixels.
 
     Returns:
-        Synthetic image as a BGR uint8 NumPy array.
+        Haze-free scene as a BGR float32 NumPy array (values in [0, 255]).
     """
     # Create base canvas
-    canvas = np.zeros((height, width, 3), dtype=np.float64)
+    canvas = np.zeros((height, width, 3), dtype=np.float32)
 
     # ----- Sky (top 40%) -----
     sky_end = int(height * 0.40)
-    for y in range(sky_end):
-        # Gradient: deep blue at top → lighter blue at horizon
-        ratio = y / sky_end
-        r = 135 + 100 * ratio   # Red increases toward horizon
-        g = 180 + 60 * ratio    # Green increases
-        b = 235                 # Blue stays high
-        canvas[y, :] = [b, g, r]  # BGR
+    # Gradient: deep blue at top → lighter blue at horizon
+    ratio = np.arange(sky_end) / sky_end
+    r = 135 + 100 * ratio       # Red increases toward horizon
+    g = 180 + 60 * ratio        # Green increases
+    b = np.full_like(r, 235)    # Blue stays high
+    canvas[:sky_end, :, :] = np.stack([b, g, r], axis=1)[:, None, :]  # BGR
 
     # ----- Buildings (40% – 75%) -----
     building_start = sky_end
@@ -90,14 +83,19 @@ def generate_urban_scene(width: int = 640,
         cv2.rectangle(canvas, (bx, by), (bx + bw, building_end), colour, -1)
 
         # Simple windows (small bright rectangles)
+        # One draw per window in row-major order, so a single vector of
+        # rng draws keeps the random sequence of the per-window loop
         win_size = 6
-        for wy in range(by + 8, building_end - 8, 14):
-            for wx in range(bx + 6, bx + bw - 6, 12):
-                if rng.random() > 0.3:  # Some windows are dark
-                    win_colour = [180, 200, 220]
-                    cv2.rectangle(canvas, (wx, wy),
-                                  (wx + win_size, wy + win_size),
-                                  win_colour, -1)
+        wy, wx = np.meshgrid(np.arange(by + 8, building_end - 8, 14),
+                             np.arange(bx + 6, bx + bw - 6, 12),
+                             indexing="ij")
+        keep = rng.random(wy.shape) > 0.3  # Some windows are dark
+        win_colour = [180, 200, 220]
+        # The filled rectangle spans win_size + 1 pixels on each side
+        offsets = np.arange(win_size + 1)
+        rows = wy[keep][:, None, None] + offsets[None, :, None]
+        cols = wx[keep][:, None, None] + offsets[None, None, :]
+        canvas[rows, cols] = win_colour
 
     # ----- Road (bottom 25%) -----
     road_start = building_end
@@ -108,25 +106,65 @@ def generate_urban_scene(width: int = 640,
         cv2.rectangle(canvas, (x, height - 20),
                       (x + 30, height - 16), [200, 200, 200], -1)
 
+    return canvas
+
+
+def _apply_haze(canvas: np.ndarray, haze_level: float) -> np.ndarray:
+    """
+    Blend a haze-free scene toward a white "atmospheric light"
+    proportional to haze_level.
+
+    Args:
+        canvas:     Output of `_build_scene()` (left unmodified).
+        haze_level: Float in [0, 1].  0 = perfectly clear, 1 = whiteout.
+
+    Returns:
+        Hazy image as a BGR uint8 NumPy array.
+    """
+    height = canvas.shape[0]
+
     # ----- Apply haze -----
     # Haze = blend toward atmospheric light (white-ish)
     # This simulates the Koschmieder model:  I(x) = J(x)*t + A*(1-t)
-    atm_light = np.array([235, 235, 240], dtype=np.float64)
+    atm_light = np.array([235, 235, 240], dtype=np.float32)
 
     # Apply mostly uniform haze with a slight depth gradient.
     # The depth gradient is intentionally weak so that the dominant
     # signal is the overall haze_level, not the spatial variation.
-    for y in range(height):
-        # Mild depth factor: ranges from 1.0 (top/far) to 0.85 (bottom/near)
-        depth_factor = 1.0 - (y / height) * 0.15
-        t = 1.0 - haze_level * depth_factor
-        t = max(t, 0.05)  # Never fully opaque
-        canvas[y] = canvas[y] * t + atm_light * (1 - t)
+    # Mild depth factor per row: 1.0 (top/far) to 0.85 (bottom/near)
+    depth_factor = 1.0 - (np.arange(height) / height) * 0.15
+    t = np.maximum(1.0 - haze_level * depth_factor, 0.05)  # Never fully opaque
+    t = t.astype(np.float32)  # Blend in float32, like the canvas
+    t = t[:, None, None]  # Broadcast one transmission value over each row
+    # Written as A + (J - A)*t so pixels equal to A stay exactly A in
+    # float32; one new buffer, then in-place updates
+    hazy = canvas - atm_light
+    hazy *= t
+    hazy += atm_light
+
+    # Clamp (in place) and convert to uint8
+    np.clip(hazy, 0, 255, out=hazy)
+    return hazy.astype(np.uint8)
 
-    # Clamp and convert to uint8
-    canvas = np.clip(canvas, 0, 255).astype(np.uint8)
 
-    return canvas
+def generate_urban_scene(width: int = 640,
+                         height: int = 480,
+                         haze_level: float = 0.4) -> np.ndarray:
+    """
+    Generate a synthetic urban scene with controllable haze.
+
+    Haze is simulated by blending the scene toward a white "atmospheric
+    light" proportional to the haze_level parameter.
+
+    Args:
+        width:      Image width in pixels.
+        height:     Image height in pixels.
+        haze_level: Float in [0, 1].  0 = perfectly clear, 1 = whiteout.
+
+    Returns:
+        Synthetic image as a BGR uint8 NumPy array.
+    """
+    return _apply_haze(_build_scene(width, height), haze_level)
 
 
 def main():
@@ -146,16 +184,18 @@ def main():
     os.makedirs(os.path.dirname(args.output), exist_ok=True)
 
     print(f"Generating synthetic urban scene (haze = {args.haze})...")
-    image = generate_urban_scene(haze_level=args.haze)
+    # The haze-free scene is built once; only the haze blend differs
+    scene = _build_scene()
+    image = _apply_haze(scene, args.haze)
     cv2.imwrite(args.output, image)
     print(f"Saved to {args.output}")
 
     # Also generate a clear and heavy-haze variant for comparison
-    clear = generate_urban_scene(haze_level=0.1)
+    clear = _apply_haze(scene, 0.1)
     cv2.imwrite("sample_images/sample_clear.jpg", clear)
     print("Saved sample_images/sample_clear.jpg (haze=0.1)")
 
-    heavy = generate_urban_scene(haze_level=0.8)
+    heavy = _apply_haze(scene, 0.8)
     cv2.imwrite("sample_images/sample_heavy_haze.jpg", heavy)
     print("Saved sample_images/sample_heavy_haze.jpg (haze=0.8)")
 
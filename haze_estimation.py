@@ -45,6 +45,7 @@ References:
 import cv2
 import numpy as np
 import matplotlib
+from numba import njit, prange
 import matplotlib.pyplot as plt
 
 # Use non-interactive backend so the module works headlessly
@@ -59,10 +60,123 @@ OMEGA = 0.95      # Fraction of haze to remove (0.95 = keep a little for
                    # depth perception — standard in the literature)
 TOP_PERCENT = 0.1  # Top 0.1% brightest pixels used to estimate atm. light
 
+# Jet colourmap as a 256-entry RGB lookup table, evaluated once at import
+JET_LUT = (plt.cm.jet(np.arange(256))[:, :3] * 255).astype(np.uint8)
+
 
 # ===========================================================================
 # 2a. DARK CHANNEL COMPUTATION
 # ===========================================================================
+@njit(parallel=True, fastmath=True, cache=True, boundscheck=False)
+def _channel_min_u8(img: np.ndarray) -> np.ndarray:
+    """
+    Per-pixel minimum over the 3 colour channels of a uint8 image, scaled
+    to [0, 1] float32.  Reads the uint8 pixels directly, so no float64
+    copy of the whole image is made.
+    """
+    h, w, _ = img.shape
+    out = np.empty((h, w), np.float32)
+    for i in prange(h):
+        for j in range(w):
+            a = img[i, j, 0]
+            b = img[i, j, 1]
+            c = img[i, j, 2]
+            m = a if a < b else b
+            m = m if m < c else c
+            out[i, j] = m * np.float32(1.0 / 255.0)
+    return out
+
+
+_KERNEL_CACHE = {}  # patch_size -> (horizontal, vertical) 1-D kernels
+
+
+def _patch_kernels(patch_size: int) -> tuple:
+    """
+    Horizontal and vertical 1-D structuring elements whose successive
+    erosions equal one patch_size × patch_size rectangular erosion (cached).
+    """
+    kernels = _KERNEL_CACHE.get(patch_size)
+    if kernels is None:
+        kernels = (
+            cv2.getStructuringElement(cv2.MORPH_RECT, (patch_size, 1)),
+            cv2.getStructuringElement(cv2.MORPH_RECT, (1, patch_size)),
+        )
+        _KERNEL_CACHE[patch_size] = kernels
+    return kernels
+
+
+def _erode_patch(img: np.ndarray, patch_size: int) -> np.ndarray:
+    """
+    Sliding-window minimum over a square patch, done as two separable 1-D
+    erosions (2·patch_size comparisons per pixel instead of patch_size²).
+    """
+    kh, kv = _patch_kernels(patch_size)
+    return cv2.erode(cv2.erode(img, kh), kv)
+
+
+# I/A is quantised as uint8 levels of I/A·255, as the dark channel of the
+# normalised image always has been: values past 255 (pixels brighter than
+# A) wrap modulo 256 like NumPy's float64 -> uint8 cast, which the PSI model
+# is calibrated against.  Kept in float64 without fastmath so each level
+# matches that cast exactly.
+_UINT8_CAST_LIMIT = 2147483648.0  # NumPy's cast goes via int32: >= 2**31 -> 0
+
+
+@njit(parallel=True, cache=True, boundscheck=False)
+def _normalised_channel_min(img: np.ndarray,
+                            a_eps: np.ndarray) -> np.ndarray:
+    """
+    Per-pixel min_c( uint8(I_c / A_c · 255) ) / 255 of a uint8 BGR image in
+    one pass (`a_eps` = A + 1e-8, float64), without any full-image float
+    temporary.
+    """
+    h, w, _ = img.shape
+    out = np.empty((h, w), np.float32)
+    scale = np.float32(1.0 / 255.0)
+    for i in prange(h):
+        for j in range(w):
+            m = 255
+            for c in range(3):
+                v = (img[i, j, c] / 255.0) / a_eps[c] * 255.0
+                q = 0 if v >= _UINT8_CAST_LIMIT else np.int64(v) & 255
+                if q < m:
+                    m = q
+            out[i, j] = m * scale
+    return out
+
+
+@njit(parallel=True, fastmath=True, cache=True, boundscheck=False)
+def _transmission_inplace(dark: np.ndarray, omega: np.float32) -> None:
+    """
+    t = clip(1 − ω·dark, 0.01, 1) written over the dark channel in one
+    parallel pass over the rows.
+    """
+    h, w = dark.shape
+    lo = np.float32(0.01)
+    one = np.float32(1.0)
+    for i in prange(h):
+        for j in range(w):
+            t = one - omega * dark[i, j]
+            if t < lo:
+                t = lo
+            elif t > one:
+                t = one
+            dark[i, j] = t
+
+
+# Prefer the ahead-of-time compiled kernels (`python build_kernels.py`),
+# which need no first-run compile; fall back to the cached JIT kernels above
+try:
+    import airwana_kernels as _aot
+    _channel_min = _aot.channel_min_u8
+    _normalised_min = _aot.normalised_channel_min
+    _transmission = _aot.transmission_inplace
+except ImportError:
+    _channel_min = _channel_min_u8
+    _normalised_min = _normalised_channel_min
+    _transmission = _transmission_inplace
+
+
 def compute_dark_channel(image_bgr: np.ndarray,
                          patch_size: int = PATCH_SIZE) -> np.ndarray:
     """
@@ -87,21 +201,16 @@ def compute_dark_channel(image_bgr: np.ndarray,
         patch_size: Side length of the square patch (default 15).
 
     Returns:
-        Dark channel image (single-channel, float64, range [0, 1]).
+        Dark channel image (single-channel, float32, range [0, 1]).
     """
-    # Normalise to [0, 1] for numerical stability
-    img = image_bgr.astype(np.float64) / 255.0
-
-    # Step A: Per-pixel minimum across colour channels
+    # Step A: Per-pixel minimum across colour channels, normalised to [0, 1]
     # For each pixel, take the smallest of (B, G, R)
-    channel_min = np.min(img, axis=2)
+    channel_min = _channel_min(np.ascontiguousarray(image_bgr, dtype=np.uint8))
 
     # Step B: Local patch minimum using morphological erosion
-    # Erosion with a rectangular kernel computes the sliding-window min
-    kernel = cv2.getStructuringElement(
-        cv2.MORPH_RECT, (patch_size, patch_size)
-    )
-    dark_channel = cv2.erode(channel_min, kernel)
+    # Erosion with a rectangular kernel computes the sliding-window min;
+    # the square kernel is split into a horizontal and a vertical pass
+    dark_channel = _erode_patch(channel_min, patch_size)
 
     return dark_channel
 
@@ -129,14 +238,13 @@ def estimate_atmospheric_light(image_bgr: np.ndarray,
 
     Args:
         image_bgr:   Input image (BGR, uint8).
-        dark_channel: Dark channel (float64, [0, 1]).
+        dark_channel: Dark channel (float32, [0, 1]).
         top_percent:  Fraction of pixels to consider (default 0.001).
 
     Returns:
         Atmospheric light as a 1-D NumPy array of shape (3,), float64,
         with values in [0, 1].
     """
-    img = image_bgr.astype(np.float64) / 255.0
     h, w = dark_channel.shape
     num_pixels = h * w
 
@@ -145,14 +253,18 @@ def estimate_atmospheric_light(image_bgr: np.ndarray,
 
     # Flatten and find indices of the brightest dark-channel pixels
     flat_dc = dark_channel.ravel()
-    indices = np.argsort(flat_dc)[-num_top:]  # largest values last
+    # argpartition selects the top-k in O(N); their order is irrelevant
+    indices = np.argpartition(flat_dc, -num_top)[-num_top:]
 
     # Among candidates, find the pixel with highest total intensity
-    flat_img = img.reshape(-1, 3)
-    intensities = np.sum(flat_img[indices], axis=1)
+    # (summed on the uint8 pixels, gathered only at the candidates)
+    flat_img = np.ascontiguousarray(image_bgr).reshape(-1, 3)
+    intensities = flat_img[indices].sum(axis=1, dtype=np.int32)
     best = indices[np.argmax(intensities)]
 
-    atmospheric_light = flat_img[best]
+    # float64 k/255 (only 3 values): the transmission kernel's uint8
+    # quantisation of I/A is sensitive to the last bits of A
+    atmospheric_light = flat_img[best] / 255.0
     return atmospheric_light
 
 
@@ -182,30 +294,24 @@ def compute_transmission_map(image_bgr: np.ndarray,
         omega:             Haze retention factor (default 0.95).
 
     Returns:
-        Transmission map t(x), float64, range roughly [0, 1].
+        Transmission map t(x), float32, range roughly [0, 1].
         - Values near 1.0 → clear  (light travels unimpeded).
         - Values near 0.0 → heavy haze (most light scattered away).
     """
-    img = image_bgr.astype(np.float64) / 255.0
-
     # Normalise each channel by the atmospheric light
     # This effectively asks: "How much of the observed intensity
     # is attributable to haze vs. the scene?"
-    normalised = img / (atmospheric_light + 1e-8)
-
-    # Compute the dark channel of the normalised image
-    dc_norm = compute_dark_channel(
-        (normalised * 255).astype(np.uint8).clip(0, 255),
-        patch_size
-    )
-    # Re-normalise since we passed uint8
-    dc_norm = dc_norm.astype(np.float64)
+    # Division, uint8 quantisation and channel minimum run in one fused
+    # kernel.
+    a_eps = np.asarray(atmospheric_light, dtype=np.float64) + 1e-8
+    channel_min = _normalised_min(
+        np.ascontiguousarray(image_bgr, dtype=np.uint8), a_eps)
 
-    # Transmission estimate
-    transmission = 1.0 - omega * dc_norm
+    # Dark channel of the normalised image (sliding-window minimum)
+    transmission = _erode_patch(channel_min, patch_size)
 
-    # Clamp to valid range
-    transmission = np.clip(transmission, 0.01, 1.0)
+    # Transmission estimate, clamped to the valid range, in place
+    _transmission(transmission, np.float32(omega))
 
     return transmission
 
@@ -226,65 +332,85 @@ def compute_haze_map(transmission: np.ndarray) -> np.ndarray:
     This is the primary signal from which we extract pollution features.
 
     Args:
-        transmission: Transmission map t(x), float64, [0, 1].
+        transmission: Transmission map t(x), float32, [0, 1].
 
     Returns:
-        Haze intensity map, float64, [0, 1].
+        Haze intensity map, float32, [0, 1].
     """
-    return 1.0 - transmission
+    return np.float32(1.0) - transmission
 
 
 # ===========================================================================
 # 2e. VISUALISATION
 # ===========================================================================
 def visualise_haze_map(haze_map: np.ndarray,
-                       output_path: str = "output/haze_map.png") -> np.ndarray:
+                       output_path: str = "output/haze_map.png",
+                       fast: bool = True) -> np.ndarray:
     """
     Render the haze map as a colour-mapped image:
         Blue  = clear air (low haze)
         Red   = dense haze (high haze)
 
-    Uses Matplotlib's 'jet' colormap for intuitive hot/cold encoding.
+    Uses a 'jet' colormap for intuitive hot/cold encoding.  The fast path
+    colours the map with OpenCV and writes it straight to disk; the full
+    path builds a Matplotlib figure with a title and colourbar.
 
     Args:
-        haze_map:    Haze intensity map (float64, [0, 1]).
+        haze_map:    Haze intensity map (float32, [0, 1]).
         output_path: Where to save the visualisation.
+        fast:        Use OpenCV's colormap instead of a Matplotlib figure.
 
     Returns:
         Colour-mapped image as an RGB uint8 NumPy array (for embedding).
     """
+    if fast:
+        u8 = (np.clip(haze_map, 0.0, 1.0) * 255).astype(np.uint8)
+        colormapped_bgr = cv2.applyColorMap(u8, cv2.COLORMAP_JET)
+        cv2.imwrite(output_path, colormapped_bgr)
+        return cv2.cvtColor(colormapped_bgr, cv2.COLOR_BGR2RGB)
+
     fig, ax = plt.subplots(1, 1, figsize=(6, 5))
     im = ax.imshow(haze_map, cmap="jet", vmin=0.0, vmax=1.0)
     ax.set_title("Haze Intensity Map\n(Blue = Clear · Red = Hazy)", fontsize=11)
     ax.axis("off")
     cbar = fig.colorbar(im, ax=ax, fraction=0.046, pad=0.04)
     cbar.set_label("Haze Intensity", fontsize=10)
+    # tight_layout already fits the fixed layout; bbox_inches="tight" would
+    # render the figure twice per save
     fig.tight_layout()
-    fig.savefig(output_path, dpi=150, bbox_inches="tight")
+    fig.savefig(output_path, dpi=150)
     plt.close(fig)
 
-    # Also return an RGB array for compositing later
-    colormapped = (plt.cm.jet(haze_map)[:, :, :3] * 255).astype(np.uint8)
-    return colormapped
+    # Also return an RGB array for compositing later (same binning as
+    # plt.cm.jet on floats, done as one table gather)
+    index = np.minimum(np.clip(haze_map, 0.0, 1.0) * 256, 255).astype(np.uint8)
+    return JET_LUT[index]
 
 
 # ===========================================================================
 # PUBLIC API
 # ===========================================================================
-def estimate_haze(image_bgr: np.ndarray) -> dict:
+def estimate_haze(image_bgr: np.ndarray,
+                  visualize: bool = True,
+                  fast: bool = True) -> dict:
     """
     Full haze estimation pipeline.
 
     Args:
         image_bgr: Preprocessed image in BGR, uint8.
+        visualize: Render and save the haze map visualisation.  Pass False
+                   when only the numeric maps are needed.
+        fast:      Render with OpenCV instead of Matplotlib (see
+                   `visualise_haze_map`).
 
     Returns:
         Dictionary with:
-            - 'dark_channel'      : Dark channel image (float64)
+            - 'dark_channel'      : Dark channel image (float32)
             - 'atmospheric_light' : Estimated A (shape (3,))
-            - 'transmission_map'  : t(x) (float64)
-            - 'haze_map'          : 1 − t(x) (float64)
-            - 'haze_map_rgb'      : Colormapped visualisation (uint8 RGB)
+            - 'transmission_map'  : t(x) (float32)
+            - 'haze_map'          : 1 − t(x) (float32)
+            - 'haze_map_rgb'      : Colormapped visualisation (uint8 RGB),
+                                    or None when visualize is False
     """
     # 2a — Dark Channel
     dark_channel = compute_dark_channel(image_bgr)
@@ -298,8 +424,8 @@ def estimate_haze(image_bgr: np.ndarray) -> dict:
     # 2d — Haze Map (inverted transmission)
     haze_map = compute_haze_map(transmission)
 
-    # 2e — Visualisation
-    haze_rgb = visualise_haze_map(haze_map)
+    # 2e — Visualisation (optional)
+    haze_rgb = visualise_haze_map(haze_map, fast=fast) if visualize else None
 
     return {
         "dark_channel": dark_channel,
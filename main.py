@@ -36,7 +36,7 @@ from preprocessing import preprocess
 from haze_estimation import estimate_haze
 from feature_extraction import extract_haze_features, features_to_vector
 from psi_model import load_model, predict_psi, psi_category, train_model
-from output_handler import assemble_result
+from output_handler import SUMMARY_PATH, assemble_result, ensure_dir
 
 
 def print_banner():
@@ -53,7 +53,8 @@ def print_banner():
     print(banner)
 
 
-def run_pipeline(image_path: str) -> dict:
+def run_pipeline(image_path: str, blur: bool = False,
+                 save_outputs: bool = True) -> dict:
     """
     Execute the full AIRWANA pipeline on a single image.
 
@@ -65,13 +66,16 @@ def run_pipeline(image_path: str) -> dict:
         5. Assemble and output results.
 
     Args:
-        image_path: Path to the input outdoor RGB image.
+        image_path:   Path to the input outdoor RGB image.
+        blur:         Apply the optional 3×3 box blur in preprocessing.
+        save_outputs: Write the haze-map and summary images to output/
+                      (off when several pipelines run concurrently).
 
     Returns:
         Dictionary containing all output artifacts (see output_handler.py).
     """
     # Ensure output directory exists
-    os.makedirs("output", exist_ok=True)
+    ensure_dir("output")
 
     # ===================================================================
     # STEP 1: IMAGE PREPROCESSING
@@ -81,12 +85,13 @@ def run_pipeline(image_path: str) -> dict:
     print("=" * 60)
 
     t0 = time.time()
-    preprocessed = preprocess(image_path)
+    preprocessed = preprocess(image_path, blur=blur)
     t1 = time.time()
 
     h, w = preprocessed["original_bgr"].shape[:2]
     print(f"  [OK] Image loaded and resized to {w}x{h}")
-    print(f"  [OK] Gaussian blur applied (noise reduction)")
+    if blur:
+        print(f"  [OK] Box blur applied (noise reduction)")
     print(f"  [TIME] Preprocessing took {t1 - t0:.3f}s")
 
     # ===================================================================
@@ -97,7 +102,8 @@ def run_pipeline(image_path: str) -> dict:
     print("=" * 60)
 
     t0 = time.time()
-    haze_result = estimate_haze(preprocessed["processed_bgr"])
+    haze_result = estimate_haze(preprocessed["processed_bgr"],
+                                visualize=save_outputs)
     t1 = time.time()
 
     atm_light = haze_result["atmospheric_light"]
@@ -106,7 +112,8 @@ def run_pipeline(image_path: str) -> dict:
           f"R={atm_light[2]:.3f}  G={atm_light[1]:.3f}  B={atm_light[0]:.3f}")
     print(f"  [OK] Transmission map computed (omega = 0.95)")
     print(f"  [OK] Haze intensity map generated")
-    print(f"  [OK] Haze map visualisation saved to output/haze_map.png")
+    if save_outputs:
+        print(f"  [OK] Haze map visualisation saved to output/haze_map.png")
     print(f"  [TIME] Haze estimation took {t1 - t0:.3f}s")
 
     # ===================================================================
@@ -151,12 +158,14 @@ def run_pipeline(image_path: str) -> dict:
         features=features,
         psi=psi,
         category=category,
+        save_summary=save_outputs,
     )
 
     # Print explanation to console
     print(result["explanation"])
 
-    print("  [OK] Summary image saved to output/result_summary.png")
+    if save_outputs:
+        print(f"  [OK] Summary image saved to {SUMMARY_PATH}")
     print("\n  Pipeline complete.\n")
 
     return result
@@ -187,6 +196,11 @@ def main():
         action="store_true",
         help="Force re-training the PSI model on synthetic data.",
     )
+    parser.add_argument(
+        "--blur",
+        action="store_true",
+        help="Apply a light 3x3 box blur before haze estimation.",
+    )
 
     args = parser.parse_args()
 
@@ -201,7 +215,7 @@ def main():
         train_model()
 
     # Run the full pipeline
-    run_pipeline(args.image)
+    run_pipeline(args.image, blur=args.blur)
 
 
 if __name__ == "__main__":
@@ -22,12 +22,16 @@ Design Notes:
 
 import os
 import textwrap
+import multiprocessing
+from functools import lru_cache
 
 import numpy as np
-import matplotlib
-import matplotlib.pyplot as plt
-
-matplotlib.use("Agg")
+from matplotlib import colormaps, font_manager
+from matplotlib.cm import ScalarMappable
+from matplotlib.colors import Normalize
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from PIL import Image, ImageColor, ImageDraw, ImageFont
 
 
 # ---------------------------------------------------------------------------
@@ -74,6 +78,12 @@ EXPLANATION_TEMPLATE = textwrap.dedent("""\
 +========================================================================+
 """)
 
+# Only the header lines carry placeholders; the rest of the template is
+# static, so it is split off once here and appended verbatim per call.
+_HEAD_END = EXPLANATION_TEMPLATE.index("\n", EXPLANATION_TEMPLATE.index("{mean_haze")) + 1
+_EXPLANATION_HEAD = EXPLANATION_TEMPLATE[:_HEAD_END]
+_EXPLANATION_TAIL = EXPLANATION_TEMPLATE[_HEAD_END:]
+
 
 def generate_explanation(psi: float, category: str,
                          mean_haze: float) -> str:
@@ -88,11 +98,164 @@ def generate_explanation(psi: float, category: str,
     Returns:
         Formatted multi-line string.
     """
-    return EXPLANATION_TEMPLATE.format(
+    return _EXPLANATION_HEAD.format(
         psi=psi,
         category=category,
         mean_haze=mean_haze,
-    )
+    ) + _EXPLANATION_TAIL
+
+
+# ---------------------------------------------------------------------------
+# Output directories
+# ---------------------------------------------------------------------------
+_dirs_created: set = set()   # Directories already ensured by this process
+
+# The summary is a preview image, so it is written as JPEG (several times
+# faster to encode than PNG); pass a ".png" path for a lossless copy
+SUMMARY_PATH = "output/result_summary.jpg"
+SUMMARY_JPEG_QUALITY = 85
+
+
+def ensure_dir(path: str) -> None:
+    """
+    `os.makedirs(path, exist_ok=True)`, issued once per directory per
+    process rather than on every image.
+    """
+    if path and path not in _dirs_created:
+        os.makedirs(path, exist_ok=True)
+        _dirs_created.add(path)
+
+
+# ---------------------------------------------------------------------------
+# Worker processes
+# ---------------------------------------------------------------------------
+def worker_context():
+    """
+    Multiprocessing context for worker pools.
+
+    Never plain "fork": forking after Numba's TBB thread pool has started
+    hangs the parent at exit.  A fork server (POSIX) or a spawned
+    interpreter starts each worker from a clean process.
+    """
+    methods = multiprocessing.get_all_start_methods()
+    method = "forkserver" if "forkserver" in methods else "spawn"
+    return multiprocessing.get_context(method)
+
+
+# ---------------------------------------------------------------------------
+# Summary info strip
+# ---------------------------------------------------------------------------
+# The one-line metrics box under the panels is drawn with Pillow onto a
+# cached background tile rather than laid out by Matplotlib's text engine.
+_FIG_FACECOLOUR = "#0f0f1a"
+# Box facecolour "#1a1a2e" at alpha 0.9, pre-blended over the background
+_BOX_FILL = tuple(round(0.9 * f + 0.1 * b) for f, b in
+                  zip(ImageColor.getrgb("#1a1a2e"),
+                      ImageColor.getrgb(_FIG_FACECOLOUR)))
+_STRIP_FRACTION = 0.06           # Bottom share of the figure kept free
+_INFO_FONT_PT = 11
+
+
+@lru_cache(maxsize=None)
+def _info_font(dpi: int) -> ImageFont.FreeTypeFont:
+    """Matplotlib's bold sans-serif font at the info-text size, in pixels."""
+    path = font_manager.findfont(
+        font_manager.FontProperties(family="sans-serif", weight="bold"))
+    return ImageFont.truetype(path, round(_INFO_FONT_PT * dpi / 72))
+
+
+@lru_cache(maxsize=None)
+def _strip_background(width: int, height: int) -> Image.Image:
+    """Blank strip in the figure facecolour (copied before drawing)."""
+    return Image.new("RGBA", (width, height), _FIG_FACECOLOUR)
+
+
+def _draw_info_strip(width: int, height: int, dpi: int,
+                     info_text: str, colour: str) -> Image.Image:
+    """
+    Render the info text centred in a rounded, severity-outlined box on a
+    strip of the given size.
+    """
+    strip = _strip_background(width, height).copy()
+    draw = ImageDraw.Draw(strip)
+    font = _info_font(dpi)
+
+    left, top, right, bottom = draw.textbbox((0, 0), info_text, font=font)
+    text_w, text_h = right - left, bottom - top
+    pad = round(0.5 * _INFO_FONT_PT * dpi / 72)  # boxstyle pad=0.5 (em)
+    x = (width - text_w) // 2
+    y = (height - text_h) // 2
+
+    draw.rounded_rectangle(
+        (x - pad, y - pad, x + text_w + pad, y + text_h + pad),
+        radius=pad, fill=_BOX_FILL, outline=colour, width=max(1, dpi // 72))
+    draw.text((x - left, y - top), info_text, fill=colour, font=font)
+    return strip
+
+
+# ---------------------------------------------------------------------------
+# Persistent summary figure
+# ---------------------------------------------------------------------------
+# Building the Figure, axes, colourbar and layout dominates a summary render,
+# so one figure is kept per process and only its image data is swapped per
+# call.  Not thread-safe: render summaries from one thread per process
+# (Matplotlib is not thread-safe either).
+_SUMMARY_FIGURE = None   # (fig, canvas, original_artist, haze_artist, shape)
+
+# Jet as a 256-entry RGB table: the haze panel is coloured with one gather
+# instead of Matplotlib's per-pixel normalise + colormap pass.  Same
+# binning as the colormap on floats in [0, 1].
+_JET_LUT = colormaps["jet"](np.arange(256), bytes=True)[:, :3]
+
+
+def _jet_rgb(haze_map: np.ndarray) -> np.ndarray:
+    """Colour a [0, 1] haze map through the jet LUT (RGB uint8)."""
+    return _JET_LUT[np.minimum(np.clip(haze_map, 0.0, 1.0) * 256,
+                               255).astype(np.uint8)]
+
+
+def _summary_figure(original_rgb: np.ndarray, haze_map: np.ndarray) -> tuple:
+    """
+    Return the cached summary figure showing the two given images.  It is
+    built on first use, and rebuilt only if the image size changes (the
+    layout depends on the panels' aspect ratio).
+    """
+    global _SUMMARY_FIGURE
+    if (_SUMMARY_FIGURE is not None
+            and _SUMMARY_FIGURE[4] == original_rgb.shape[:2]):
+        fig, canvas, original_artist, haze_artist, _ = _SUMMARY_FIGURE
+        original_artist.set_data(original_rgb)
+        haze_artist.set_data(_jet_rgb(haze_map))
+        return _SUMMARY_FIGURE
+
+    # Object-oriented Agg figure: no pyplot state to register or close
+    fig = Figure(figsize=(14, 6), dpi=150, facecolor=_FIG_FACECOLOUR,
+                 edgecolor="none")
+    canvas = FigureCanvasAgg(fig)
+    axes = fig.subplots(1, 2)
+
+    # --- Left panel: Original image ---
+    original_artist = axes[0].imshow(original_rgb)
+    axes[0].set_title("Original Image", fontsize=13, fontweight="bold")
+    axes[0].axis("off")
+
+    # --- Right panel: Haze map ---
+    haze_artist = axes[1].imshow(_jet_rgb(haze_map))
+    axes[1].set_title("Haze Intensity Map\n(Blue = Clear · Red = Hazy)",
+                      fontsize=13, fontweight="bold")
+    axes[1].axis("off")
+    # The panel is pre-coloured RGB, so the colourbar gets its own mappable
+    cbar = fig.colorbar(ScalarMappable(Normalize(0.0, 1.0), "jet"),
+                        ax=axes[1], fraction=0.046, pad=0.04)
+    cbar.set_label("Haze Intensity", fontsize=10)
+
+    fig.suptitle("AIRWANA — Camera-Based Air Pollution Estimation",
+                 fontsize=15, fontweight="bold", y=0.98)
+    fig.tight_layout(rect=[0, _STRIP_FRACTION, 1, 0.95])
+
+    _SUMMARY_FIGURE = (fig, canvas, original_artist, haze_artist,
+                       original_rgb.shape[:2])
+    return _SUMMARY_FIGURE
 
 
 def save_summary_image(original_rgb: np.ndarray,
@@ -100,7 +263,7 @@ def save_summary_image(original_rgb: np.ndarray,
                        psi: float,
                        category: str,
                        features: dict,
-                       output_path: str = "output/result_summary.png"):
+                       output_path: str = SUMMARY_PATH):
     """
     Create and save a side-by-side summary image:
         Left  — Original input image
@@ -113,24 +276,12 @@ def save_summary_image(original_rgb: np.ndarray,
         psi:          Predicted PSI value.
         category:     Air quality category.
         features:     Feature dict from feature_extraction.
-        output_path:  File path to save the composite image.
+        output_path:  File path to save the composite image (JPEG unless
+                      it ends in ".png").
     """
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    ensure_dir(os.path.dirname(output_path))
 
-    fig, axes = plt.subplots(1, 2, figsize=(14, 6))
-
-    # --- Left panel: Original image ---
-    axes[0].imshow(original_rgb)
-    axes[0].set_title("Original Image", fontsize=13, fontweight="bold")
-    axes[0].axis("off")
-
-    # --- Right panel: Haze map ---
-    im = axes[1].imshow(haze_map, cmap="jet", vmin=0.0, vmax=1.0)
-    axes[1].set_title("Haze Intensity Map\n(Blue = Clear · Red = Hazy)",
-                      fontsize=13, fontweight="bold")
-    axes[1].axis("off")
-    cbar = fig.colorbar(im, ax=axes[1], fraction=0.046, pad=0.04)
-    cbar.set_label("Haze Intensity", fontsize=10)
+    fig, canvas, _, _, _ = _summary_figure(original_rgb, haze_map)
 
     # --- Bottom text block ---
     # Choose colour based on severity
@@ -150,17 +301,24 @@ def save_summary_image(original_rgb: np.ndarray,
         f"Variance: {features['haze_variance']:.6f}  |  "
         f"Contrast: {features['contrast']:.4f}"
     )
-    fig.text(0.5, 0.02, info_text, ha="center", fontsize=11,
-             fontweight="bold", color=colour,
-             bbox=dict(boxstyle="round,pad=0.5", facecolor="#1a1a2e",
-                       edgecolor=colour, alpha=0.9))
 
-    fig.suptitle("AIRWANA — Camera-Based Air Pollution Estimation",
-                 fontsize=15, fontweight="bold", y=0.98)
-    fig.tight_layout(rect=[0, 0.06, 1, 0.95])
-    fig.savefig(output_path, dpi=150, bbox_inches="tight",
-                facecolor="#0f0f1a", edgecolor="none")
-    plt.close(fig)
+    # Render the panels once, paste the Pillow info strip over the reserved
+    # bottom band, and write the buffer straight to disk
+    canvas.draw()
+    width, height = canvas.get_width_height()
+    image = Image.frombuffer("RGBA", (width, height), canvas.buffer_rgba(),
+                             "raw", "RGBA", 0, 1).copy()
+    strip_h = round(height * _STRIP_FRACTION)
+    image.paste(_draw_info_strip(width, strip_h, int(fig.dpi),
+                                 info_text, colour),
+                (0, height - strip_h))
+    if output_path.lower().endswith(".png"):
+        # Fast zlib level since the summary is written on every run
+        image.save(output_path, "PNG", compress_level=1, optimize=False)
+    else:
+        image.convert("RGB").save(output_path, "JPEG",
+                                  quality=SUMMARY_JPEG_QUALITY,
+                                  optimize=False)
     print(f"[Output] Summary image saved to {output_path}")
 
 
@@ -168,7 +326,8 @@ def assemble_result(original_rgb: np.ndarray,
                     haze_result: dict,
                     features: dict,
                     psi: float,
-                    category: str) -> dict:
+                    category: str,
+                    save_summary: bool = True) -> dict:
     """
     Assemble the complete output package.
 
@@ -178,6 +337,7 @@ def assemble_result(original_rgb: np.ndarray,
         features:     Dictionary from feature_extraction.extract_haze_features().
         psi:          Predicted PSI float.
         category:     Air quality category string.
+        save_summary: Render the summary image to disk.
 
     Returns:
         Dictionary containing all output artifacts.
@@ -185,13 +345,14 @@ def assemble_result(original_rgb: np.ndarray,
     explanation = generate_explanation(psi, category, features["mean_haze"])
 
     # Save composite visualisation
-    save_summary_image(
-        original_rgb=original_rgb,
-        haze_map=haze_result["haze_map"],
-        psi=psi,
-        category=category,
-        features=features,
-    )
+    if save_summary:
+        save_summary_image(
+            original_rgb=original_rgb,
+            haze_map=haze_result["haze_map"],
+            psi=psi,
+            category=category,
+            features=features,
+        )
 
     return {
         "original_image": original_rgb,
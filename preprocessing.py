@@ -9,19 +9,22 @@ Operations:
     1. Load the image from disk.
     2. Resize to a manageable resolution (preserving aspect ratio).
     3. Ensure the image is in RGB colour space.
-    4. Apply a light Gaussian blur to suppress sensor noise.
+    4. Optionally apply a light box blur to suppress sensor noise.
 
 Design Notes:
     - We resize to a maximum dimension of 640px. This keeps computation
       fast while retaining enough spatial detail for haze estimation.
-    - The Gaussian blur kernel is intentionally small (3×3) so that we
-      reduce noise without smearing the edges that the Dark Channel
-      Prior relies on.
+    - The blur is OFF by default: the Dark Channel's 15×15 minimum
+      filter already suppresses pixel-level noise, and the extra pass
+      touches the whole image.  When enabled, the kernel is intentionally
+      small (3×3) so that we reduce noise without smearing the edges that
+      the Dark Channel Prior relies on.
 =============================================================================
 """
 
 import cv2
 import numpy as np
+from PIL import Image
 
 
 # ---------------------------------------------------------------------------
@@ -31,12 +34,43 @@ MAX_DIMENSION = 640        # Maximum width or height after resizing
 BLUR_KERNEL_SIZE = (3, 3)  # Small kernel — noise reduction without edge loss
 
 
-def load_image(image_path: str) -> np.ndarray:
+# OpenCV flags that decode at 1/8, 1/4 or 1/2 scale (libjpeg skips most of
+# the IDCT work); largest reduction first
+_REDUCED_READ_FLAGS = (
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2),
+)
+
+
+def _read_flag(image_path: str, max_dim: int) -> int:
+    """
+    Pick the strongest reduced-decode flag that still leaves the largest
+    dimension at or above `max_dim`, from the header size alone.
+    """
+    try:
+        with Image.open(image_path) as header:  # Reads the header only
+            w, h = header.size
+    except OSError:
+        return cv2.IMREAD_COLOR
+    for factor, flag in _REDUCED_READ_FLAGS:
+        if max(w, h) >= factor * max_dim:
+            return flag
+    return cv2.IMREAD_COLOR
+
+
+def load_image(image_path: str, max_dim: int = None) -> np.ndarray:
     """
     Load an image from the filesystem.
 
+    The file is memory-mapped and decoded with `cv2.imdecode`.  When
+    `max_dim` is given and the image is at least twice that size, it is
+    decoded directly at 1/2, 1/4 or 1/8 scale, since `resize_image` would
+    shrink it anyway.
+
     Args:
         image_path: Absolute or relative path to the image file.
+        max_dim:    Largest dimension needed downstream (None = full size).
 
     Returns:
         The image as a NumPy array in BGR colour space (OpenCV default).
@@ -44,7 +78,12 @@ def load_image(image_path: str) -> np.ndarray:
     Raises:
         FileNotFoundError: If the image cannot be read from disk.
     """
-    image = cv2.imread(image_path)
+    flag = cv2.IMREAD_COLOR if max_dim is None else _read_flag(image_path, max_dim)
+    try:
+        data = np.memmap(image_path, dtype=np.uint8, mode="r")
+    except (OSError, ValueError):  # Missing or empty file
+        data = None
+    image = cv2.imdecode(data, flag) if data is not None else None
     if image is None:
         raise FileNotFoundError(
             f"Could not load image at '{image_path}'. "
@@ -89,70 +128,79 @@ def resize_image(image: np.ndarray, max_dim: int = MAX_DIMENSION) -> np.ndarray:
 
 def ensure_rgb(image_bgr: np.ndarray) -> np.ndarray:
     """
-    Convert a BGR image (OpenCV default) to RGB.
+    View a BGR image (OpenCV default) as RGB.
 
     Many visualisation libraries (Matplotlib) expect RGB ordering.
     We keep both representations available in the pipeline.
 
+    The result is a zero-copy view with a negative channel stride.
+    Matplotlib / Streamlit read it correctly, but it must NEVER be passed
+    back to OpenCV (cv2 needs contiguous buffers) — use the BGR array, or
+    `np.ascontiguousarray` first.
+
     Args:
         image_bgr: Image in BGR colour space.
 
     Returns:
-        Image in RGB colour space.
+        Image in RGB colour space (view of `image_bgr`).
     """
-    return cv2.cvtColor(image_bgr, cv2.COLOR_BGR2RGB)
+    return image_bgr[..., ::-1]
 
 
-def apply_gaussian_blur(image: np.ndarray,
-                        kernel_size: tuple = BLUR_KERNEL_SIZE) -> np.ndarray:
+def apply_box_blur(image: np.ndarray,
+                   kernel_size: tuple = BLUR_KERNEL_SIZE) -> np.ndarray:
     """
-    Apply a light Gaussian blur to reduce high-frequency sensor noise.
+    Apply a light box blur to reduce high-frequency sensor noise.
 
     A 3×3 kernel is deliberately chosen:
         - Large enough to smooth out JPEG artefacts and sensor noise.
         - Small enough to preserve the edge structure needed by the
           Dark Channel Prior's patch-wise minimum operation.
 
+    `cv2.blur` is separable and runs OpenCV's vectorised integer path.
+
     Args:
         image:       Input image (any colour space).
-        kernel_size: Gaussian kernel dimensions (default 3×3).
+        kernel_size: Box kernel dimensions (default 3×3).
 
     Returns:
         Blurred image.
     """
-    return cv2.GaussianBlur(image, kernel_size, sigmaX=0)
+    return cv2.blur(image, kernel_size)
 
 
-def preprocess(image_path: str) -> dict:
+def preprocess(image_path: str, blur: bool = False) -> dict:
     """
     Full preprocessing pipeline.
 
     Args:
         image_path: Path to the input image.
+        blur:       Apply the 3×3 box blur before haze estimation.
 
     Returns:
         Dictionary with the following keys:
             - 'original_bgr' : Original image after resizing (BGR).
-            - 'original_rgb' : Same image in RGB (for Matplotlib).
-            - 'processed_bgr': Blurred image in BGR (for OpenCV ops).
-            - 'processed_rgb': Blurred image in RGB (for display).
+            - 'original_rgb' : Same image in RGB (view, for Matplotlib).
+            - 'processed_bgr': Image for OpenCV ops (BGR; blurred if
+                               `blur`, else the resized image itself).
+            - 'processed_rgb': Same image in RGB (view, for display).
     """
     # Step 1a: Load from disk
-    raw = load_image(image_path)
+    raw = load_image(image_path, max_dim=MAX_DIMENSION)
 
     # Step 1b: Resize to manageable size
     resized = resize_image(raw)
 
-    # Step 1c: Light Gaussian blur
-    blurred = apply_gaussian_blur(resized)
+    # Step 1c: Optional light blur
+    processed = apply_box_blur(resized) if blur else resized
 
     # Step 1d: Prepare RGB copies for visualisation
     original_rgb = ensure_rgb(resized)
-    processed_rgb = ensure_rgb(blurred)
+    processed_rgb = ensure_rgb(processed) if blur else original_rgb
 
     return {
         "original_bgr": resized,
         "original_rgb": original_rgb,
-        "processed_bgr": blurred,
+        "processed_bgr": processed,
         "processed_rgb": processed_rgb,
     }
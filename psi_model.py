@@ -42,8 +42,11 @@ PSI scale used (Singapore-style, simplified):
 
 import os
 import pickle
+import weakref
 
+import joblib
 import numpy as np
+from numba import njit, prange
 from sklearn.ensemble import RandomForestRegressor
 
 # ---------------------------------------------------------------------------
@@ -53,6 +56,8 @@ MODEL_PATH = "models/psi_model.pkl"          # Saved model path
 SYNTHETIC_SAMPLES = 500                       # Number of training samples
 RANDOM_SEED = 42                              # Reproducibility
 
+_MODEL_SINGLETON = None   # Model returned by load_model after the first call
+
 
 # ===========================================================================
 # 4a. SYNTHETIC DATA GENERATION
@@ -78,50 +83,74 @@ def generate_synthetic_data(n_samples: int = SYNTHETIC_SAMPLES,
 
     Returns:
         (X, y) where:
-            X : np.ndarray of shape (n_samples, 4) — features
+            X : np.ndarray of shape (n_samples, 4) — features (float32)
             y : np.ndarray of shape (n_samples,) — PSI values
     """
     rng = np.random.RandomState(seed)
 
     # -----------------------------------------------------------------------
-    # Generate random haze feature vectors
+    # Raw random draws (same order as always, so the data — and the model —
+    # stay reproducible for a given seed)
     # -----------------------------------------------------------------------
-    # mean_haze ∈ [0.05, 0.85]  (very clear to very hazy)
-    mean_haze = rng.uniform(0.05, 0.85, n_samples)
+    u_mean = rng.uniform(0.05, 0.85, n_samples)
+    u_var = rng.uniform(0.001, 0.08, n_samples)
+    u_max = rng.uniform(0.05, 0.20, n_samples)
+    u_contrast = rng.uniform(0.1, 0.9, n_samples)
+    noise = rng.normal(0, 8, n_samples)     # Gaussian noise (sensor error)
+
+    # mean_haze ** 1.2 stays in NumPy: its pow differs from LLVM's in the
+    # last bit, and the training data should not change
+    mean_pow = u_mean ** 1.2
+
+    # Features and PSI target in one fused pass over the draws.  X is
+    # C-contiguous float32 (the dtype the trees split on), so train_model
+    # needs no conversion copy.
+    X = np.empty((n_samples, 4), dtype=np.float32)
+    psi = np.empty(n_samples)
+    _synthesise(u_mean, mean_pow, u_var, u_max, u_contrast, noise, X, psi)
 
-    # variance ∈ [0.001, 0.08]  (correlated with mean — denser haze
-    #                             tends to be more uniform → lower var)
-    haze_variance = rng.uniform(0.001, 0.08, n_samples) * (1 - 0.5 * mean_haze)
+    return X, psi
 
-    # max_haze ∈ [mean_haze, 1.0]  (always ≥ mean)
-    max_haze = mean_haze + rng.uniform(0.05, 0.20, n_samples)
-    max_haze = np.clip(max_haze, 0.0, 1.0)
 
-    # contrast ∈ [0.1, 0.9]  (inversely related to mean haze)
-    contrast = rng.uniform(0.1, 0.9, n_samples) * (1.2 - mean_haze)
-    contrast = np.clip(contrast, 0.0, 1.0)
+@njit(parallel=True, cache=True)
+def _synthesise(u_mean, mean_pow, u_var, u_max, u_contrast, noise, X, psi):
+    """
+    Turn the raw draws into the feature matrix X and PSI target in place.
 
-    # -----------------------------------------------------------------------
-    # Compute synthetic PSI target
-    # -----------------------------------------------------------------------
-    # Base PSI driven primarily by mean haze (non-linear — exponential-ish)
-    # mean_haze is the dominant driver.  Other features provide secondary
-    # corrections but must NOT override the primary signal.
-    psi = (
-        350 * mean_haze ** 1.2           # Primary driver (dominant)
-        + 50 * max_haze                   # Boost from peak haze
-        - 10 * contrast                   # Minor penalty for clear regions
-        - 5 * haze_variance * 100         # Slight penalty for patchiness
-        + rng.normal(0, 8, n_samples)     # Gaussian noise (sensor error)
-    )
+    Columns of X: mean_haze, haze_variance, max_haze, contrast.
+    """
+    for i in prange(u_mean.shape[0]):
+        # mean_haze ∈ [0.05, 0.85]  (very clear to very hazy)
+        mean_haze = u_mean[i]
 
-    # Clamp PSI to a realistic range [0, 500]
-    psi = np.clip(psi, 0, 500)
+        # variance ∈ [0.001, 0.08]  (correlated with mean — denser haze
+        #                             tends to be more uniform → lower var)
+        haze_variance = u_var[i] * (1 - 0.5 * mean_haze)
 
-    # Assemble feature matrix
-    X = np.column_stack([mean_haze, haze_variance, max_haze, contrast])
+        # max_haze ∈ [mean_haze, 1.0]  (always ≥ mean)
+        max_haze = min(max(mean_haze + u_max[i], 0.0), 1.0)
 
-    return X, psi
+        # contrast ∈ [0.1, 0.9]  (inversely related to mean haze)
+        contrast = min(max(u_contrast[i] * (1.2 - mean_haze), 0.0), 1.0)
+
+        # Base PSI driven primarily by mean haze (non-linear — exponential-ish)
+        # mean_haze is the dominant driver.  Other features provide secondary
+        # corrections but must NOT override the primary signal.
+        value = (
+            350 * mean_pow[i]                 # Primary driver (dominant)
+            + 50 * max_haze                   # Boost from peak haze
+            - 10 * contrast                   # Minor penalty for clear regions
+            - 5 * haze_variance * 100         # Slight penalty for patchiness
+            + noise[i]                        # Gaussian noise (sensor error)
+        )
+
+        # Clamp PSI to a realistic range [0, 500]
+        psi[i] = min(max(value, 0.0), 500.0)
+
+        X[i, 0] = mean_haze
+        X[i, 1] = haze_variance
+        X[i, 2] = max_haze
+        X[i, 3] = contrast
 
 
 # ===========================================================================
@@ -138,6 +167,8 @@ def train_model(X: np.ndarray = None, y: np.ndarray = None,
         - 100 trees (enough for a smooth prediction surface)
         - max_depth = 10  (prevents overfitting on 500 samples)
         - min_samples_leaf = 5
+        - max_features = 1.0  (all 4 features per split; with so few
+          features "sqrt" saves little and changes the fitted model)
 
     Args:
         X:    Feature matrix (n_samples, 4).  If None, uses synthetic data.
@@ -151,16 +182,26 @@ def train_model(X: np.ndarray = None, y: np.ndarray = None,
         print("[PSI Model] No real data provided — generating synthetic data.")
         X, y = generate_synthetic_data()
 
+    # Trees split on float32 features internally; casting up front skips
+    # sklearn's own copy.  Targets in float32 are ample for PSI in [0, 500].
+    X = np.asarray(X, dtype=np.float32)
+    y = np.asarray(y, dtype=np.float32)
+
     model = RandomForestRegressor(
         n_estimators=100,
         max_depth=10,
         min_samples_leaf=5,
+        max_features=1.0,
         random_state=RANDOM_SEED,
         n_jobs=-1,
     )
 
     model.fit(X, y)
 
+    # PSI is predicted one image at a time; for a single row the joblib
+    # thread pool costs more than walking 100 trees sequentially
+    model.set_params(n_jobs=1)
+
     # Report training performance (R² score on training set)
     train_score = model.score(X, y)
     print(f"[PSI Model] Training R² score: {train_score:.4f}")
@@ -176,10 +217,15 @@ def train_model(X: np.ndarray = None, y: np.ndarray = None,
     # Save model
     if save:
         os.makedirs(os.path.dirname(MODEL_PATH), exist_ok=True)
-        with open(MODEL_PATH, "wb") as f:
-            pickle.dump(model, f)
+        # Uncompressed joblib dump, so load_model can memory-map the arrays
+        joblib.dump(model, MODEL_PATH, protocol=pickle.HIGHEST_PROTOCOL)
         print(f"[PSI Model] Saved to {MODEL_PATH}")
 
+    _pack_forest(model)  # Pack the node arrays once, not on first predict
+    if save:
+        # The saved model is what load_model would read back
+        global _MODEL_SINGLETON
+        _MODEL_SINGLETON = model
     return model
 
 
@@ -191,14 +237,21 @@ def load_model() -> RandomForestRegressor:
     Load a previously trained model from disk.
 
     If no saved model exists, trains a new one on synthetic data.
+    The model is kept for the lifetime of the process, so later calls
+    return it without touching the filesystem.
 
     Returns:
         Trained RandomForestRegressor instance.
     """
+    global _MODEL_SINGLETON
+    if _MODEL_SINGLETON is not None:
+        return _MODEL_SINGLETON
+
     if os.path.exists(MODEL_PATH):
-        with open(MODEL_PATH, "rb") as f:
-            model = pickle.load(f)
+        model = joblib.load(MODEL_PATH)
         print(f"[PSI Model] Loaded from {MODEL_PATH}")
+        _pack_forest(model)  # Pack the node arrays once, not on first predict
+        _MODEL_SINGLETON = model
         return model
     else:
         print(f"[PSI Model] No saved model found — training new model.")
@@ -208,11 +261,114 @@ def load_model() -> RandomForestRegressor:
 # ===========================================================================
 # 4d. PREDICTION
 # ===========================================================================
+# For one 4-feature row, sklearn's input validation and per-tree dispatch
+# cost far more than the tree walks themselves.  The fitted forest is packed
+# once into flat node arrays and walked in a Numba kernel instead.
+_PACKED_FORESTS = weakref.WeakKeyDictionary()  # model -> packed node arrays
+
+# Memoised predictions, one dict per model (feature tuple -> PSI).  Held
+# weakly by model, so a replaced model frees its memo and packed forest.
+_PREDICTION_MEMOS = weakref.WeakKeyDictionary()
+_MEMO_SIZE = 4096  # Entries kept per model (oldest dropped first)
+
+
+def _pack_forest(model: RandomForestRegressor) -> tuple:
+    """
+    Concatenate the nodes of every fitted tree into flat arrays
+    (feature, threshold, left, right, value) plus each tree's root offset.
+    Child indices are rebased to the concatenated arrays.
+    """
+    packed = _PACKED_FORESTS.get(model)
+    if packed is not None:
+        return packed
+
+    feature, threshold, left, right, value, roots = [], [], [], [], [], []
+    offset = 0
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        is_leaf = tree.children_left < 0
+        roots.append(offset)
+        feature.append(tree.feature)
+        threshold.append(tree.threshold)
+        left.append(np.where(is_leaf, -1, tree.children_left + offset))
+        right.append(np.where(is_leaf, -1, tree.children_right + offset))
+        value.append(tree.value[:, 0, 0])
+        offset += tree.node_count
+
+    # Thresholds shrink to float32 without changing any split: for a float32
+    # x, `x <= t` holds exactly when `x <= t32`, t32 being the largest
+    # float32 not above t.  With int8 feature ids this halves the bytes
+    # walked per node.
+    threshold = np.concatenate(threshold)
+    threshold32 = threshold.astype(np.float32)
+    rounded_up = threshold32 > threshold
+    threshold32[rounded_up] = np.nextafter(threshold32[rounded_up],
+                                           np.float32(-np.inf))
+
+    packed = (
+        np.concatenate(feature).astype(np.int8),
+        threshold32,
+        np.concatenate(left).astype(np.int32),
+        np.concatenate(right).astype(np.int32),
+        np.concatenate(value).astype(np.float64),
+        np.asarray(roots, dtype=np.int32),
+    )
+    _PACKED_FORESTS[model] = packed
+    return packed
+
+
+@njit(cache=True)
+def _forest_predict(x, feature, threshold, left, right, value, roots):
+    """
+    Mean of the tree predictions for one sample, walking each tree from its
+    root.  `x` is float32, as in sklearn's tree predictor, and the float32
+    thresholds are rounded so every split goes the same way.
+    """
+    total = 0.0
+    for t in range(roots.shape[0]):
+        node = roots[t]
+        while left[node] != -1:
+            if x[feature[node]] <= threshold[node]:
+                node = left[node]
+            else:
+                node = right[node]
+        total += value[node]
+    return total / roots.shape[0]
+
+
+# Prefer the ahead-of-time compiled forest walk (`python build_kernels.py`),
+# a plain C entry point with no first-call compile; fall back to the cached
+# JIT kernel above
+try:
+    import airwana_kernels as _aot
+    _walk_forest = _aot.forest_predict
+except ImportError:
+    _walk_forest = _forest_predict
+
+
+def _predict_cached(model: RandomForestRegressor, key: tuple) -> float:
+    """Forest prediction for one float32 feature tuple (memoised per model)."""
+    memo = _PREDICTION_MEMOS.get(model)
+    if memo is None:
+        memo = _PREDICTION_MEMOS[model] = {}
+    psi = memo.get(key)
+    if psi is None:
+        psi = _walk_forest(np.asarray(key, dtype=np.float32),
+                           *_pack_forest(model))
+        if len(memo) >= _MEMO_SIZE:
+            del memo[next(iter(memo))]
+        memo[key] = psi
+    return psi
+
+
 def predict_psi(model: RandomForestRegressor,
                 feature_vector: np.ndarray) -> float:
     """
     Predict the PSI value from a haze feature vector.
 
+    Repeated feature vectors (e.g. consecutive frames of a static scene)
+    are served from a cache.
+
     Args:
         model:          Trained regressor.
         feature_vector: 1-D array of shape (4,) —
@@ -221,32 +377,55 @@ def predict_psi(model: RandomForestRegressor,
     Returns:
         Predicted PSI value (float, clamped to [0, 500]).
     """
-    # Reshape for single-sample prediction
-    X = feature_vector.reshape(1, -1)
-    psi = model.predict(X)[0]
+    # The forest sees float32 inputs (as in sklearn), so the float32 values
+    # are an exact cache key
+    key = tuple(np.asarray(feature_vector, dtype=np.float32).ravel().tolist())
+    psi = _predict_cached(model, key)
 
     # Clamp to valid range
     psi = float(np.clip(psi, 0, 500))
     return round(psi, 1)
 
 
-def psi_category(psi: float) -> str:
+def predict_psi_batch(model: RandomForestRegressor,
+                      feature_matrix: np.ndarray) -> np.ndarray:
+    """
+    Predict PSI values for several images in one `model.predict` call.
+
+    For N images this pays sklearn's input validation and per-tree dispatch
+    once rather than N times.
+
+    Args:
+        model:          Trained regressor.
+        feature_matrix: 2-D array of shape (N, 4), one row per image in the
+                        order of `features_to_vector()`.
+
+    Returns:
+        Array of shape (N,) with the PSI values (clamped to [0, 500],
+        rounded to 1 decimal).
+    """
+    X = np.asarray(feature_matrix, dtype=np.float32).reshape(-1, 4)
+    return np.clip(model.predict(X), 0, 500).round(1)
+
+
+# Upper bound (inclusive) of each category but the last, and the categories
+_PSI_THRESHOLDS = np.array([50, 100, 200, 300], dtype=np.float64)
+_PSI_CATEGORIES = np.array(
+    ["Good", "Moderate", "Unhealthy", "Very Unhealthy", "Hazardous"],
+    dtype=object)
+
+
+def psi_category(psi):
     """
     Map a numeric PSI value to a human-readable air quality category.
 
+    One `searchsorted` over the sorted thresholds replaces an if/elif
+    ladder, and works on a whole batch of PSI values at once.
+
     Args:
-        psi: Predicted PSI value.
+        psi: Predicted PSI value, or an array of them.
 
     Returns:
-        Category string.
-    """
-    if psi <= 50:
-        return "Good"
-    elif psi <= 100:
-        return "Moderate"
-    elif psi <= 200:
-        return "Unhealthy"
-    elif psi <= 300:
-        return "Very Unhealthy"
-    else:
-        return "Hazardous"
+        Category string (object array of strings for array input).
+    """
+    return _PSI_CATEGORIES[np.searchsorted(_PSI_THRESHOLDS, psi, side="left")]
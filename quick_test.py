@@ -1,16 +1,19 @@
 """Final validation: run pipeline on all 3 images and write results."""
-import sys, json
+import sys, json, os
 if sys.platform == "win32":
     try:
         sys.stdout.reconfigure(encoding="utf-8", errors="replace")
     except: pass
 
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
 from preprocessing import preprocess
 from haze_estimation import estimate_haze
 from feature_extraction import extract_haze_features, features_to_vector
-from psi_model import load_model, predict_psi, psi_category
-
-model = load_model()
+from output_handler import worker_context
+from psi_model import load_model, predict_psi_batch, psi_category
 
 images = [
     ("sample_images/sample_clear.jpg",     "Clear_0.1"),
@@ -18,25 +21,43 @@ images = [
     ("sample_images/sample_heavy_haze.jpg","Heavy_0.8"),
 ]
 
-all_results = []
-for path, label in images:
+
+def image_features(path):
+    """Haze features of one image (runs in a worker process)."""
     pp = preprocess(path)
-    hz = estimate_haze(pp["processed_bgr"])
-    ft = extract_haze_features(hz["haze_map"])
-    fv = features_to_vector(ft)
-    psi = predict_psi(model, fv)
-    cat = psi_category(psi)
-    entry = {"label": label, "psi": psi, "category": cat}
-    entry.update(ft)
-    all_results.append(entry)
-    print(f"{label}: PSI={psi}, category={cat}, mean_haze={ft['mean_haze']}")
-
-with open("output/validation.json", "w") as f:
-    json.dump(all_results, f, indent=2)
-
-# Validate ordering
-psival = [r["psi"] for r in all_results]
-if psival[0] < psival[1] < psival[2]:
-    print("PASS: PSI increases with haze (clear < medium < heavy)")
-else:
-    print(f"WARN: Ordering issue: {psival}")
+    hz = estimate_haze(pp["processed_bgr"], visualize=False)
+    return extract_haze_features(hz["haze_map"])
+
+
+if __name__ == "__main__":
+    model = load_model()
+
+    # Extract features for every image in parallel, then predict all PSIs at once
+    n_workers = min(len(images), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=n_workers,
+                             mp_context=worker_context()) as pool:
+        all_features = list(pool.map(image_features, [p for p, _ in images]))
+
+    feature_matrix = np.empty((len(images), 4), dtype=np.float32)
+    for i, ft in enumerate(all_features):
+        feature_matrix[i] = features_to_vector(ft)
+
+    psis = predict_psi_batch(model, feature_matrix)
+    cats = psi_category(psis)
+
+    all_results = []
+    for (path, label), ft, psi, cat in zip(images, all_features, psis.tolist(), cats):
+        entry = {"label": label, "psi": psi, "category": cat}
+        entry.update(ft)
+        all_results.append(entry)
+        print(f"{label}: PSI={psi}, category={cat}, mean_haze={ft['mean_haze']:.4f}")
+
+    with open("output/validation.json", "w") as f:
+        json.dump(all_results, f, indent=2)
+
+    # Validate ordering
+    psival = [r["psi"] for r in all_results]
+    if psival[0] < psival[1] < psival[2]:
+        print("PASS: PSI increases with haze (clear < medium < heavy)")
+    else:
+        print(f"WARN: Ordering issue: {psival}")
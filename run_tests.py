@@ -23,7 +23,41 @@ if sys.platform == "win32":
     except Exception:
         pass
 
+import contextlib
+import io
+from concurrent.futures import ProcessPoolExecutor
+
+import numba
+import numpy as np
+
+from haze_estimation import visualise_haze_map
 from main import run_pipeline
+from output_handler import save_summary_image, worker_context
+from psi_model import load_model
+
+
+def _init_worker(n_workers: int) -> None:
+    """Per-worker setup: split the cores and load the model."""
+    numba.set_num_threads(max(1, numba.config.NUMBA_NUM_THREADS // n_workers))
+    load_model()
+
+
+def _run_test(image_path: str) -> tuple:
+    """
+    Run the pipeline on one image in a worker.  Its console output is
+    captured so the parent can print each test's log in order.
+
+    The workers share output/, so they write no images; the parent renders
+    each test's haze map and summary in order instead.
+    """
+    log = io.StringIO()
+    with contextlib.redirect_stdout(log):
+        result = run_pipeline(image_path, save_outputs=False)
+    # Only what the comparison and the output images need crosses back
+    slim = {key: result[key] for key in
+            ("original_image", "haze_map", "psi", "category", "features")}
+    slim["original_image"] = np.ascontiguousarray(slim["original_image"])
+    return log.getvalue(), slim
 
 
 def main():
@@ -33,6 +67,21 @@ def main():
         ("sample_images/sample_heavy_haze.jpg",  "HEAVY HAZE (haze=0.8)"),
     ]
 
+    found = [(path, label) for path, label in test_images
+             if os.path.isfile(path)]
+
+    # The images are independent, so each runs in its own process.  The
+    # model is loaded (or trained and saved) here first so the workers
+    # only ever read it.
+    load_model()
+    n_workers = max(1, min(len(found), os.cpu_count() or 1))
+    with ProcessPoolExecutor(max_workers=n_workers,
+                             mp_context=worker_context(),
+                             initializer=_init_worker,
+                             initargs=(n_workers,)) as pool:
+        runs = dict(zip((path for path, _ in found),
+                        pool.map(_run_test, [path for path, _ in found])))
+
     results = []
 
     for image_path, label in test_images:
@@ -40,11 +89,17 @@ def main():
         print(f"  TEST: {label}")
         print("#" * 70)
 
-        if not os.path.isfile(image_path):
+        if image_path not in runs:
             print(f"  [SKIP] Image not found: {image_path}")
             continue
 
-        result = run_pipeline(image_path)
+        log, result = runs[image_path]
+        print(log, end="")
+        # One image at a time, so output/ ends with the last test's images
+        visualise_haze_map(result["haze_map"])
+        save_summary_image(result["original_image"], result["haze_map"],
+                           result["psi"], result["category"],
+                           result["features"])
         results.append((label, result))
 
     # --- Comparison Summary ---